@@ -43,7 +43,8 @@ logger = logging.getLogger('crawler')
 DEFAULT_CONFIG_MODE = 'demodocusfw.config.mode_accessibility_vision_users'
 
 
-def parse_args():
+def parse_args(argv=None):
+    """Parses the command line arguments, or argv if given (without the program name)."""
     parser = argparse.ArgumentParser()
     parser.add_argument('entry_point', nargs='?', metavar='ep', default=None,
                         help='String to use to load or launch the initial state to crawl, like a url')
@@ -68,7 +69,7 @@ def parse_args():
     parser.add_argument('-v', '--verbose', action='store_const',
                         dest='log_level', const=logging.INFO,
                         help='Verbose log output (logging at INFO)')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # allow args to accept new item assignments
     d = vars(args)
@@ -82,8 +83,16 @@ def parse_args():
     return args
 
 
-if __name__ == '__main__':
-    args = parse_args()
+def main(argv=None):
+    """Runs the crawler, as from the command line.
+
+    Args:
+        argv: Command line arguments, without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        The exit status: 0 on success, 1 if the configuration mode couldn't be loaded.
+    """
+    args = parse_args(argv)
 
     logger.debug(f'Loading config mode: {args.mode}')
     if args.mode == 'default':
@@ -93,7 +102,8 @@ if __name__ == '__main__':
             config_spec = check_config_mode(args.mode)
         except Exception as e:
             logger.error(e)
-            sys.exit(f'Unable to load configuration mode: {args.mode}')
+            print(f'Unable to load configuration mode: {args.mode}', file=sys.stderr)
+            return 1
     config = import_config_from_spec(config_spec)
 
     # If these args are present on command line, override even a specified mode
@@ -106,3 +116,8 @@ if __name__ == '__main__':
     crawler = Crawler(config=config)
     crawler.crawl_all(args.entry_points)
     del crawler
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -85,9 +85,11 @@ Public utility functions
 """
 
 import collections
+import functools
 import json
 import os
 import pathlib
+import pickle
 from types import ModuleType
 
 import matplotlib.pyplot as plt
@@ -249,7 +251,7 @@ class BaseAnalyzer:
             assert isinstance(user_model, UserModel), f"user_models " \
                 f"\"{user_model}\" is not a UserModel object"
 
-        full_graph = nx.read_gml(self.graph_fpath)
+        full_graph = self._read_full_graph()
         self.full_graph = full_graph
 
         # Storing the build_user and its relevant information
@@ -263,6 +265,73 @@ class BaseAnalyzer:
 
         self._users = users_dict
 
+    def _read_full_graph(self):
+        """Reads the full graph from the .gml file at self.graph_fpath.
+
+        The last graph read is kept in memory, keyed by the file's path,
+        modification time and size, so analyzing the same crawl again in this
+        process (e.g., the crawler's report and then a test) only copies it.
+
+        Returns:
+            The full graph as a networkx graph.
+        """
+        stat = os.stat(self.graph_fpath)
+        full_graph = self._load_full_graph(os.path.abspath(self.graph_fpath),
+                                           stat.st_mtime_ns, stat.st_size,
+                                           getattr(self.config, "USE_GPICKLE", False))
+        # The analysis adds fields to the graph, so never hand out the cached one.
+        return full_graph.copy()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_full_graph(graph_fpath, mtime_ns, size, use_gpickle):
+        """Loads the full graph for _read_full_graph().
+
+        Parsing a large .gml file is slow, so when USE_GPICKLE is set in the
+        config, the parsed graph is also pickled next to the .gml file. Later
+        analyses of the same crawl load the pickle instead, as long as it is
+        newer than the .gml file.
+
+        Args:
+            graph_fpath: absolute path of the .gml file
+            mtime_ns: modification time of the .gml file, for the cache key
+            size: size of the .gml file, for the cache key
+            use_gpickle: whether to keep a pickle of the graph
+
+        Returns:
+            The full graph as a networkx graph.
+        """
+        if not use_gpickle:
+            return BaseAnalyzer._read_gml(graph_fpath)
+
+        pickle_fpath = pathlib.Path(graph_fpath).with_suffix(".gpickle")
+        if pickle_fpath.is_file() and pickle_fpath.stat().st_mtime_ns >= mtime_ns:
+            with open(pickle_fpath, "rb") as fp:
+                return pickle.load(fp)
+
+        full_graph = BaseAnalyzer._read_gml(graph_fpath)
+        with open(pickle_fpath, "wb") as fp:
+            pickle.dump(full_graph, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        return full_graph
+
+    @staticmethod
+    def _read_gml(gml_fpath):
+        """Reads a .gml file into a networkx graph keyed by the node labels, as
+        nx.read_gml(gml_fpath) does.
+
+        Graph.to_gml() labels each node with its id, so the graph is read keyed
+        by id and only relabeled when a label differs. That saves networkx
+        copying the whole graph to relabel it.
+
+        Returns:
+            The graph as a networkx graph.
+        """
+        graph = nx.read_gml(gml_fpath, label="id")
+        labels = {node: data.pop("label", node) for node, data in graph.nodes(data=True)}
+        if any(label != node for node, label in labels.items()):
+            graph = nx.relabel_nodes(graph, labels)
+        return graph
+
     # --
     # Property (getter/setter) methods.
     #   May be overridden.
@@ -800,8 +869,10 @@ class BaseAnalyzer:
         """
 
         try:
-            with open(fpath, 'w') as fp:
-                json.dump(dictionary, fp, indent=2)
+            # Encode in one go, like StateData.save(), rather than through many
+            #  small writes to the file.
+            pathlib.Path(fpath).write_bytes(
+                json.dumps(dictionary, indent=2).encode('utf-8'))
             return True
         except Exception as e:
             print(e)
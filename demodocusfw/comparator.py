@@ -29,6 +29,9 @@ import re
 
 logger = logging.getLogger('crawler.comparator')
 
+# Characters StrictComparator ignores: semicolons and whitespace.
+_STRICT_IGNORE_RE = re.compile(r'[;\s]+')
+
 
 class BaseComparator:
     """Base class for Comparators."""
@@ -54,7 +57,7 @@ class StrictComparator(BaseComparator):
     # It removes spaces and semicolons.
     # If it passes, we can stop looking.
     def __init__(self):
-        self.re_sub = re.compile(r'[;\s]+')
+        self.re_sub = _STRICT_IGNORE_RE
 
     def match(self, state_data1, state_data2):
         """Determines if two string state_data match.
@@ -66,13 +69,17 @@ class StrictComparator(BaseComparator):
         Returns:
             True if they pass and False if they do not pass.
         """
+        # Identical data matches without normalizing it.
+        if state_data1 is state_data2 or state_data1 == state_data2:
+            return True
+
         state_data1 = self.re_sub.sub('', str(state_data1))
         state_data2 = self.re_sub.sub('', str(state_data2))
 
         match_result = state_data1 == state_data2
 
-        logger.debug("Running a {} with:\nstate_data1 = [\n\t{}\n\t   ]\nstate_data2 = [\n\t{}\n\t   ]\nreturned = {}\n".format(\
-            self.__class__.__name__, str(state_data1), str(state_data2), match_result))
+        logger.debug("Running a %s with:\nstate_data1 = [\n\t%s\n\t   ]\nstate_data2 = [\n\t%s\n\t   ]\nreturned = %s\n",
+                     self.__class__.__name__, state_data1, state_data2, match_result)
 
         return match_result
 
@@ -109,8 +116,9 @@ class Comparer:
         if pipeline is None:
             pipeline = self.default_pipeline
 
-        logger.debug("Starting a compare pipeline with:\n\t{}\n"\
-            .format(',\n\t'.join([i[0].__class__.__name__ for i in self.default_pipeline])))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Starting a compare pipeline with:\n\t{}\n"\
+                .format(',\n\t'.join([i[0].__class__.__name__ for i in self.default_pipeline])))
 
         for comparator, flags in pipeline:
             is_last = comparator == pipeline[-1][0]
@@ -126,3 +134,22 @@ class Comparer:
                 error_str = "Error running comparator {}: {}".format(comparator.__class__.__name__, str(e))
                 logger.error(error_str)
                 raise Exception(error_str)
+
+    @classmethod
+    def compare_batch(self, state_datas, pipeline=None):
+        """Runs compare() on every pair in a list of state_datas. Each pair is
+        only compared once, since the comparators are symmetric.
+
+        Args:
+            state_datas: A list of string representations of state_datas.
+            pipeline: A list of comparators. Defaulted to None.
+
+        Returns:
+            A list of lists of booleans, where [i][j] is whether state_datas i and j match.
+        """
+        n = len(state_datas)
+        matches = [[True] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1, n):
+                matches[i][j] = matches[j][i] = self.compare(state_datas[i], state_datas[j], pipeline)
+        return matches
@@ -101,6 +101,17 @@ OUTPUT_FILE = 'crawl.log'
 # Used by the Crawler class.
 REPORTS = ['all']
 
+# Stream the gml report to disk as it is formatted, instead of building the
+#  whole file in memory first? Keeps memory flat when writing very large graphs.
+# Used by the Crawler class.
+STREAM_GML = False
+
+# Keep a pickle of the parsed gml report (full_graph.gpickle) for the analyzer?
+#  Parsing a large gml file is slow, so re-running the analysis on the same crawl
+#  loads the pickle instead. Only load pickles from crawls you ran yourself.
+# Used by the BaseAnalyzer class.
+USE_GPICKLE = False
+
 # Take screenshots, one for every state? These will land in OUTPUTDIR, per crawl entry point.
 # Used by the Crawler class and the Controller class.
 SCREENSHOTS = True
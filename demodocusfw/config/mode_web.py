@@ -54,6 +54,16 @@ STATE_DATA = WebStateData
 #  window will open for every active thread.
 HEADLESS = True
 
+# Should the browser load images? Turning this off saves time and memory when a
+#  crawl or test doesn't depend on them, but an image without a width and height
+#  may then take up a different amount of space on the page.
+LOAD_IMAGES = True
+
+# URL of a Selenium server (e.g., a selenium/standalone-chrome container at
+#  'http://localhost:4444') to run Chrome on, instead of starting a local
+#  chromedriver for every browser. None to use a local chromedriver.
+REMOTE_WEBDRIVER_URL = None
+
 # For headful or headless browser instances, set the window size for all chrome
 #  windows opened.
 WINDOW_SIZE = (1920, 1080)
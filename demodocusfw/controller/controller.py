@@ -82,7 +82,7 @@ class Controller:
             graph.Graph representing the built graph for a given UserModel
         """
 
-        graph = Graph()
+        graph = Graph(use_lock=False)
         self.graph = graph
 
         # If no start state specified, use the current state.
@@ -200,7 +200,8 @@ class Controller:
 
             # Just completely set the dom in the browser to this state.
             logger.info("-- Crawling state {} --".format(state.id))
-            for outgoing_edge in graph.get_edges_for_state(state):
+            # Sorted, so each user's recorded paths don't depend on set ordering.
+            for outgoing_edge in graph.get_edges_for_state(state, sort_by_id=True):
 
                 # Simulate action based on what is captured by the build_user
                 edge_metrics = self.access.simulate_action_on_element(user,
@@ -223,7 +224,7 @@ class Controller:
 
     def reset_graph(self):
         """Reset graph, use after one crawl ends, before another starts."""
-        self.graph = Graph()
+        self.graph = Graph(use_lock=False)
         self.crawled_users = set()
 
     def load(self, entry_point):
@@ -199,7 +199,8 @@ def crawl(user, graph, build_user, access=None, start_state=None):
             state = states_to_visit.pop()
             logger.info("-- Crawling state {} --".format(state.id))
 
-            for outgoing_edge in graph.get_edges_for_state(state):
+            # Sorted, so each user's recorded paths don't depend on set ordering.
+            for outgoing_edge in graph.get_edges_for_state(state, sort_by_id=True):
                 # Simulate action based on what is captured by the build_user
                 edge_metrics = access.simulate_action_on_element(user,
                                                                  outgoing_edge.action,
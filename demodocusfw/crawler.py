@@ -27,6 +27,7 @@ Main script for controlling the demodocus crawler.
 """
 
 import csv
+from functools import lru_cache
 import importlib.util
 import logging
 import os
@@ -91,12 +92,11 @@ class Crawler:
                 or 'config' in self.reports:
             config_fname = Path(self.output_dir) / 'crawl_config.txt'
             # Only write fields in config that are all uppercase
+            attrs = ((k, v) for k, v in sorted(vars(self.config).items())
+                     if k.isupper())
             with open(config_fname, 'w') as config_fp:
                 config_fp.write(f'ARGV = {sys.argv}\n\n')
-                for k in dir(self.config):
-                    if k.isupper():
-                        config_fp.write('{} = {}\n\n'.format(k,
-                                        getattr(self.config, k, '')))
+                config_fp.write(''.join(f'{k} = {v}\n\n' for k, v in attrs))
 
         # crawl and report only one entry point
         if len(entry_points) == 1:
@@ -117,9 +117,10 @@ class Crawler:
                                         self.crawl_users, self.use_multi,
                                         entry_point_id)
                 if self.screenshot_dir:
-                    shutil.copytree(self.screenshot_dir,
-                        Path(self.output_dir) / f"ep-{entry_point_id}" / "screenshots")
-                    shutil.rmtree(self.screenshot_dir)
+                    # The screenshot dir lives in the output dir, so this is
+                    #  a single rename rather than a per-file copy + delete.
+                    shutil.move(str(self.screenshot_dir),
+                        str(Path(self.output_dir) / f"ep-{entry_point_id}" / "screenshots"))
                     os.makedirs(self.screenshot_dir, exist_ok=True)
                 entry_point_id += 1
 
@@ -214,6 +215,9 @@ def crawl_one(controller, entry_point, crawl, build_user, users,
     # Note: always build the graph with OmniUser first.
     logger.info('Building graph w/{}'.format(build_user.get_name()))
     controller.build_graph(build_user)
+    # The crawl users only add data to existing states and edges, so the
+    #  graph structure is fixed from here on.
+    controller.graph.freeze()
     users_crawled = [build_user.get_name()]
     crawl.add(pos, entry_point, time()-t0, len(controller.graph.get_states()),
               len(controller.graph.get_edges()), users_crawled)
@@ -287,7 +291,7 @@ def report(controller, entry_point, config, crawl, pos=-1):
     if 'all' in config.REPORTS \
             or 'gml' in config.REPORTS:
         fname = Path(crawl_output_dir) / 'full_graph.gml'
-        controller.graph.to_gml(config.BUILD_USER, fname)
+        controller.graph.to_gml(config.BUILD_USER, fname, use_streaming=getattr(config, 'STREAM_GML', False))
         if 'all' in config.REPORTS \
                 or 'analysis' in config.REPORTS:
             analyzer = config.ANALYZER_CLASS(fname, config)
@@ -322,12 +326,16 @@ def time_crawl(controller, entry_point, crawl, build_user, users, use_multi,
     return crawl
 
 
+@lru_cache(maxsize=None)
 def check_config_mode(mode):
     """
     Checks if configuration module can be imported without importing it
     Adapted from:
     https://www.blog.pythonlibrary.org/2016/05/27/python-201-an-intro-to-importlib/
 
+    The spec for each mode is only looked up once. The config module itself is
+    not cached (see import_config_from_spec()).
+
     Args:
         mode: A Python module, e.g. "demodocusfw.config.mode_default"
 
@@ -346,6 +354,9 @@ def import_config_from_spec(module_spec):
     Import the configuration via the passed in mode specification
     From same source as check_config_mode()
 
+    Each call returns a new module, since callers change fields of the config
+    (e.g., OUTPUT_DIR or REPORTS) for their own crawl.
+
     Args:
         module_spec: An importlib module spec.
 
@@ -28,16 +28,39 @@ from threading import Lock
 logger = logging.getLogger('crawler.edge')
 
 
+class _NullLock:
+    """No-op stand-in for a Lock, used by edges of single-threaded crawls."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_LOCK = _NullLock()
+
+
 class Edge:
     """A directed edge in a graph. The edge represents moving from an initial state to another state
     by performing an action on a specific element."""
-    def __init__(self, s1, s2, element, action):
-        self.lock = Lock()
+    # Graphs can hold many edges, so skip the per-instance __dict__.
+    __slots__ = ('lock', 'state1', 'state2', 'element', 'action', 'element_str', 'action_str',
+                 'user_metrics', 'graph')
+
+    # Mapping of (user name, output field names) to prefixed output field names
+    _key_cache = {}
+
+    def __init__(self, s1, s2, element, action, use_lock=True, graph=None):
+        # Single-threaded crawls share a no-op lock instead of allocating one per edge.
+        self.lock = Lock() if use_lock else _NULL_LOCK
         self.state1 = s1
         self.state2 = s2
         self.element = element  # The element that is acted upon in this transition
         self.action = action  # The action that caused this transition
+        self.element_str = None  # Interned str(element), set by Graph.add_edge()
+        self.action_str = None  # Interned str(action), set by Graph.add_edge()
         self.user_metrics = {}  # Dictionary of user name to EdgeMetrics
+        self.graph = graph  # The Graph this edge was created for, if any
 
     def __str__(self):
         """String representation of an Edge.
@@ -72,15 +95,19 @@ class Edge:
             user: user (instance of UserModel) or user name as string
             edge_metrics: EdgeMetrics object that stores data for a user/edge.
         """
+        user_added = False
         with self.lock:
             # add the user and the score if it doesn't already exist
             if user.get_name() not in self.user_metrics:
                 self.user_metrics[user.get_name()] = edge_metrics
+                user_added = True
             # update the score only if it's GT the existing score
             elif edge_metrics.ability_score > self.user_metrics[user.get_name()].ability_score:
-                logger.debug(f'Overwriting edge_metrics for edge [{str(self)}] and'
-                             f' user [{str(user)}]')
+                logger.debug('Overwriting edge_metrics for edge [%s] and user [%s]', self, user)
                 self.user_metrics[user.get_name()] = edge_metrics
+        # Outside our own lock, so we never hold it while waiting on the graph's.
+        if user_added and self.graph is not None:
+            self.graph.users_changed()
 
     def supports_user(self, user):
         """Determines whether this edge supports a user
@@ -105,10 +132,17 @@ class Edge:
         """
         user_name = user if isinstance(user, str) else user.get_name()
         if user_name in self.user_metrics.keys():
-            edge_output_fields = self.user_metrics[user_name].get_output_fields()
-            user_data = {user_name: self.user_metrics[user_name].ability_score}
-            for k, v in edge_output_fields.items():
-                user_data[f"{user_name}_{k}"] = v
+            edge_metrics = self.user_metrics[user_name]
+            edge_output_fields = edge_metrics.get_output_fields()
+            # The same few sets of output fields repeat across edges, so the
+            #  prefixed keys only need to be built once per (user, fields) pair.
+            cache_key = (user_name, tuple(edge_output_fields))
+            keys = Edge._key_cache.get(cache_key)
+            if keys is None:
+                keys = tuple(f"{user_name}_{k}" for k in edge_output_fields)
+                Edge._key_cache[cache_key] = keys
+            user_data = {user_name: edge_metrics.ability_score}
+            user_data.update(zip(keys, edge_output_fields.values()))
             return user_data
         else:
             # user was not supported by this edge. Return a score of 0 on this
@@ -23,44 +23,67 @@ let us know where this software is being used.
 """
 
 from collections import defaultdict, deque
+from functools import lru_cache
+from itertools import chain
 import logging
+import math
 import os
+from pathlib import Path
+import re
+import sys
 from threading import Lock
 
+import numpy as np
+
 from .edge import Edge
-from .state import State
+from .state import State, StateData
 
 logger = logging.getLogger('crawler.graph')
 
+# Matches the str() of an int or float, e.g. "3", "-0.5", "1e-05".
+_NUM_RE = re.compile(r'-?\d+(\.\d+)?([eE]-?\d+)?$')
+# Types of values that _clean_kv can cache.
+_HASHABLE_TYPES = (str, int, float, type(None))
+
 
 class Graph:
     """A set of states connected through a series of edges. The graph represents the feasible
     states that are reachable from a start state.
 
     """
-    def __init__(self, reset_state_inc=True):
+    def __init__(self, reset_state_inc=True, use_lock=True):
         self.lock = Lock()
+        self.use_lock = use_lock  # Whether edges need their own locks (multi-threaded crawls)
         self.states = set()
+        self._states_by_key = defaultdict(list)  # Mapping of state data hash to states
+        self._states_by_id = {}  # Mapping of state id to state
         self.edges = defaultdict(set)  # Mapping of states to outgoing edges
+        self._all_edges = []  # Every edge in the graph, in the order added
         self.start_state = None
         if reset_state_inc:
             State.reset_inc()
+        # Compressed sparse row (CSR) snapshot of the edges, built by freeze(),
+        #  as a (row_ptr, col_idx, csr_edges, rows) tuple. The outgoing edges of
+        #  the state at row r are at positions row_ptr[r]:row_ptr[r+1] of col_idx
+        #  (target rows) and csr_edges; rows maps state id to row. It is never
+        #  modified, only replaced, so readers can use it without the lock.
+        self._csr = None
+        # Bumped by users_changed() whenever one of our edges gains a user.
+        self._users_version = 0
+        # Paths found on the frozen snapshot, as a (csr, users version, dict) tuple;
+        #  the dict maps (state1 id, state2 id, user name) to the path. Only valid while
+        #  both the snapshot and the version match.
+        self._path_cache = (None, None, {})
 
     def __contains__(self, other):
-        """TODO: Does it make sense to handle this for multiple types?"""
-        if type(other) == str:
-            # It's a dom str
-            for state in self.get_states():
-                if state.data == other.data:
-                    return True
-        elif type(other) == State:
-            for state in self.get_states():
-                if state == other:
-                    return True
-        elif type(other) == Edge:
-            for edge in self.get_edges():
-                if edge == other:
-                    return True
+        """Checks whether a State, Edge, or matching StateData is in the graph."""
+        if isinstance(other, StateData):
+            return self.find_state_by_data(other) is not None
+        elif isinstance(other, State):
+            return other in self.states
+        elif isinstance(other, Edge):
+            # Edges are only ever stored under the id of their first state.
+            return other in self.edges.get(other.state1.id, ())
         return False
 
     def add_state(self, state_data):
@@ -80,15 +103,18 @@ class Graph:
             state = self.find_state_by_data(state_data)
             if not state:
                 state = State(state_data)
-                logger.debug("Adding new state {}".format(state.id))
+                logger.debug("Adding new state %s", state.id)
                 self.states.add(state)
+                self._states_by_key[hash(state_data)].append(state)
+                self._states_by_id[state.id] = state
+                self._thaw()
                 # If this is the first state, assume it is the start state.
                 if self.start_state is None:
-                    logger.debug('Assigned start state: {}'.format(state))
+                    logger.debug('Assigned start state: %s', state)
                     self.start_state = state
                 was_added = True
             else:
-                logger.debug("Found existing state {}".format(state))
+                logger.debug("Found existing state %s", state)
                 was_added = False
             return (was_added, state)
 
@@ -102,10 +128,7 @@ class Graph:
             The specific state with id state_id if it is in the graph, None if the id does not exist
             in the graph.
         """
-        for state in self.get_states():
-            if state.id == state_id:
-                return state
-        return None
+        return self._states_by_id.get(state_id)
 
     def find_state_by_data(self, state_data):
         """Locate the existing state that matches the data.
@@ -116,7 +139,8 @@ class Graph:
         Returns:
             The existing state, None if no state matches the data.
         """
-        for state in self.get_states():
+        # Only states whose data hashes the same can be equal.
+        for state in self._states_by_key.get(hash(state_data), ()):
             if state.data == state_data:
                 return state
         return None
@@ -135,24 +159,32 @@ class Graph:
             The edge just created.
         """
         with self.lock:
-            edge = Edge(s1, s2, element, action)
-            logger.debug('Adding new edge ' + str(edge))
+            edge = Edge(s1, s2, element, action, use_lock=self.use_lock, graph=self)
+            logger.debug('Adding new edge %s', edge)
             # self.edges[s1.id].add(edge)
             e = self.edges[s1.id]
-            e.add(edge)
+            if edge not in e:
+                # The same few elements and actions repeat across many edges,
+                #  so keep a single copy of each string form for output.
+                edge.element_str = sys.intern(str(element))
+                edge.action_str = sys.intern(str(action))
+                e.add(edge)
+                self._all_edges.append(edge)
+                self._thaw()
             return edge
 
-    def get_edges_for_state(self, state, user=None, sort_by_id=True):
+    def get_edges_for_state(self, state, user=None, sort_by_id=False):
         """Retrieves outgoing edges for a given state that is accessible by a certain type
         of user.
 
         Args:
             state: The given State object.
             user: user (instance of UserModel) or user name as string. Defaulted to None.
-            sort_by_id: Boolean indicating a sort by id. Defaulted to True.
+            sort_by_id: Boolean indicating a sort by id. Defaulted to False; pass True when
+                the order edges are visited in matters.
 
         Returns:
-            A list of outgoing edges. Defaulted to a list, sorted by state id, for any user.
+            A new list of the outgoing edges, for any user by default. Sorted by state id if sort_by_id.
 
         """
         edges = self.edges[state.id]
@@ -160,7 +192,7 @@ class Graph:
             edges = sorted(edges, key=lambda e: (e.state1.id, e.state2.id))
         if user:
             return [e for e in edges if e.supports_user(user)]
-        return edges
+        return list(edges)
 
     def get_edge_between_states(self, from_state, to_state):
         """Retrieves the first edge that goes from state1 to state2.
@@ -182,18 +214,53 @@ class Graph:
         """Returns all of the edges in the graph.
 
         Returns:
-            A combined list of all the outgoing edges from any of the states present in the graph.
+            A combined list of all the outgoing edges from any of the states present in the graph,
+            in the order they were added. The list is a copy, so callers may change it.
 
         """
-        return [e for s in self.states for e in self.get_edges_for_state(s)]
+        return list(self._all_edges)
+
+    def freeze(self):
+        """Snapshot the edges into compressed sparse row arrays for faster
+        whole-graph traversals. Call this once the graph is built; adding a
+        state or edge afterwards drops the snapshot again."""
+        with self.lock:
+            states = sorted(self.states, key=lambda s: s.id)
+            rows = {state.id: row for row, state in enumerate(states)}
+            row_ptr = np.zeros(len(states) + 1, dtype=np.int32)
+            csr_edges = []
+            for row, state in enumerate(states):
+                csr_edges.extend(self.edges[state.id])
+                row_ptr[row + 1] = len(csr_edges)
+            col_idx = np.fromiter((rows[e.state2.id] for e in csr_edges),
+                                  dtype=np.int32, count=len(csr_edges))
+            self._csr = (row_ptr, col_idx, csr_edges, rows)
+
+    def is_frozen(self):
+        """Returns True if freeze() was called and the graph hasn't changed since."""
+        return self._csr is not None
+
+    def users_changed(self):
+        """Called by an edge of this graph when it gains a user, so paths cached
+        by path() know the edges a user can traverse may have changed."""
+        with self.lock:
+            self._users_version += 1
+
+    def _thaw(self):
+        """Drop the CSR snapshot, and the paths found on it, because the graph changed."""
+        self._csr = None
+        self._path_cache = (None, None, {})
 
-    def to_gml(self, build_user, filename='state_graph.gml'):
+    def to_gml(self, build_user, filename='state_graph.gml', use_streaming=False):
         """Outputs the graph to a file in the graph modelling
         language (gml) format.
 
         Args:
             filename: A string representing the file name to which the graph will be saved.
             build_user: The type of user that built the graph
+            use_streaming: Write each node/edge through a buffered file as it is formatted,
+                instead of building the whole file in memory first. Defaulted to False; use it
+                for very large graphs.
 
         Returns:
             True on success.
@@ -204,52 +271,73 @@ class Graph:
 
         assert ext == '.gml', 'filename needs to end in ".gml"'
 
-        all_user_names = self.start_state.get_user_names()
-
-        with open(abspath, 'w') as f:
-            f.write('graph\n')
-            f.write('[\n')
-            f.write('    directed 1\n')
-            f.write('    multigraph 1\n')
-            f.write('    buildUser "{}"\n'.format(build_user.get_name()))
-            for state in self.states:
-                f.write('    node [\n')
-                f.write('        id ' + str(state.id) + '\n')
-                f.write('        label ' + str(state.id) + '\n')
-                f.write('        stub "' + str(state.stub) + '"\n')
-                f.write('        users "{}"\n'.format(','.join(sorted([user_name for user_name in state.get_user_names()]))))
-                f.write('        paths "' + ','.join(
-                        [user_name + ": " + state.get_user_path_string(user_name) for user_name in state.get_user_names()]
-                    ) + '"\n')
-                for current_user_name in all_user_names:
-                    f.write('        {} "'.format(current_user_name) + str(state.supports_user(current_user_name)) + '"\n')
-                f.write('    ]\n')
-
-            for edge_set in self.edges.values():
-                for edge in edge_set:
-                    f.write('    edge [\n')
-                    f.write('        source ' + str(edge.state1.id) + '\n')
-                    f.write('        target ' + str(edge.state2.id) + '\n')
-                    f.write('        element "' + str(edge.element) + '"\n')
-                    f.write('        action "' + str(edge.action) + '"\n')
-                    f.write('        users "' + ','.join(edge.get_user_names()) + '"\n')
-                    # Write build_data
-                    build_data = edge.user_metrics[build_user.get_name()].build_data
-                    for k, v in build_data.data.items():
-                        clean_k, clean_v = Graph._clean_kv(k, v)
-                        f.write(f'        {clean_k} {clean_v}\n')
-                    # Write user-specific data
-                    for current_user_name in all_user_names:
-                        edge_data = edge.get_user_data(current_user_name)
-                        for k, v in edge_data.items():
-                            clean_k, clean_v = Graph._clean_kv(k, v)
-                            f.write(f'        {clean_k} {clean_v}\n')
-                    f.write('    ]\n')
-            f.write(']')
+        all_user_names = list(self.start_state.get_user_names())
+        build_user_name = build_user.get_name()
+
+        # Each node/edge is formatted into a single chunk.
+        chunks = chain(
+            ['graph\n'
+             '[\n'
+             '    directed 1\n'
+             '    multigraph 1\n'
+             f'    buildUser "{build_user_name}"\n'],
+            self._gml_node_chunks(all_user_names),
+            self._gml_edge_chunks(build_user_name, all_user_names),
+            [']'])
+        # GML is ascii, so any other characters are dropped when encoding.
+        if use_streaming:
+            with open(abspath, 'w', encoding='ascii', errors='ignore', buffering=1 << 20) as f:
+                f.writelines(chunks)
+        else:
+            Path(abspath).write_bytes(''.join(chunks).encode('ascii', errors='ignore'))
 
         logger.info('Graph successfully saved to: ' + abspath)
         return True
 
+    def _gml_node_chunks(self, all_user_names):
+        """Yields the gml text of each state for to_gml()."""
+        # Both possible support lines for each user, so each node just picks one.
+        support_lines = [(user_name, (f'        {user_name} "False"\n', f'        {user_name} "True"\n'))
+                         for user_name in all_user_names]
+        for state in self.states:
+            user_names = state.get_user_names()
+            users_str = ','.join(sorted(user_names))
+            paths = ','.join([user_name + ": " + state.get_user_path_string(user_name)
+                              for user_name in user_names])
+            user_lines = ''.join([lines[user_name in user_names] for user_name, lines in support_lines])
+            yield (f'    node [\n'
+                   f'        id {state.id}\n'
+                   f'        label {state.id}\n'
+                   f'        stub "{state.stub}"\n'
+                   f'        users "{users_str}"\n'
+                   f'        paths "{paths}"\n'
+                   f'{user_lines}'
+                   f'    ]\n')
+
+    def _gml_edge_chunks(self, build_user_name, all_user_names):
+        """Yields the gml text of each edge for to_gml()."""
+        csr = self._csr
+        if csr is not None:
+            edges = csr[2]
+        else:
+            edges = (edge for edge_set in self.edges.values() for edge in edge_set)
+        for edge in edges:
+            # build_data first, then user-specific data
+            data_items = [Graph._clean_kv(k, v)
+                          for k, v in edge.user_metrics[build_user_name].build_data.data.items()]
+            for current_user_name in all_user_names:
+                data_items.extend([Graph._clean_kv(k, v)
+                                   for k, v in edge.get_user_data(current_user_name).items()])
+            data_lines = ''.join([f'        {clean_k} {clean_v}\n' for clean_k, clean_v in data_items])
+            yield (f'    edge [\n'
+                   f'        source {edge.state1.id}\n'
+                   f'        target {edge.state2.id}\n'
+                   f'        element "{edge.element_str}"\n'
+                   f'        action "{edge.action_str}"\n'
+                   f'        users "{",".join(edge.get_user_names())}"\n'
+                   f'{data_lines}'
+                   f'    ]\n')
+
     def path(self, s1, s2, user):
         """ Returns a list of edges that <user> can follow to get from <s1> to <s2>
         Should return the shortest path.
@@ -268,81 +356,145 @@ class Graph:
         if s1 == self.start_state:
             return s2.user_paths[user.get_name()] if user.get_name() in s2.user_paths else None
 
-        visited_states = set()
-        paths = []
-        new_paths = []
-        feasible_paths = []
+        # Base case
+        if s1 == s2:
+            return []
+
+        # Once frozen, search the snapshot without holding the lock, reusing earlier
+        #  results until some edge gains a user.
+        csr = self._csr
+        if csr is not None:
+            version = self._users_version
+            cache_csr, cache_version, cache = self._path_cache
+            if cache_csr is not csr or cache_version != version:
+                cache = {}
+                self._path_cache = (csr, version, cache)
+            key = (s1.id, s2.id, user if isinstance(user, str) else user.get_name())
+            if key not in cache:
+                cache[key] = self._path_frozen(csr, s1, s2, user)
+            path = cache[key]
+            # Callers may modify the path they get back.
+            return None if path is None else list(path)
 
         logger.debug('Acquiring lock for path()')
         with self.lock:
-            # Base case
-            if s1 == s2:
-                logger.debug('Release (Same state)')
-                return []
-
-            # Consider only edges that this user can traverse
-            edges_to_visit = deque(self.get_edges_for_state(s1, user=user))
-
-            while len(edges_to_visit) > 0:
-                edge = edges_to_visit.pop()
-                # No need to path to the same state twice.
-                if edge.state2 in visited_states:
-                    continue
-                visited_states.add(edge.state2)
-                if edge.supports_user(user):
-                    new_paths.clear()
-                    if edge.state1 == s1:
-                        if edge.state2 == s2:
-                            return [edge]
-                        # start a new path for each edge coming out of s1
-                        paths.append([edge])
-                    else:
-                        for path in paths:
-                            if path[-1].state2 == edge.state1:
-                                # any paths adjoining this edge should be extended
-                                new_paths.append(path + [edge])
-                                if edge.state2 == s2:
-                                    # We reached destination, path is feasible
-                                    logger.debug('Release (path)')
-                                    # print('Found path:')
-                                    # for e in new_paths[-1]:
-                                    #     print(' -> {}'.format(e))
-                                    return new_paths[-1]
-                        paths += new_paths
-
-                    for s2_edge in self.get_edges_for_state(edge.state2, user=user):
-                        if s2_edge.state2 not in visited_states:
-                            edges_to_visit.appendleft(s2_edge)
+            # Breadth-first search over states, remembering the edge used to
+            #  first reach each state so the path can be rebuilt at the end.
+            #  The edge's state1 is the previous state, so that's all we keep.
+            came_from = {s1.id: None}  # Mapping of state id to edge
+            states_to_visit = deque([s1])
+            while len(states_to_visit) > 0:
+                state = states_to_visit.popleft()
+                # Consider only edges that this user can traverse
+                for edge in self.get_edges_for_state(state, user=user):
+                    if edge.state2.id in came_from:
+                        # No need to path to the same state twice.
+                        continue
+                    came_from[edge.state2.id] = edge
+                    if edge.state2 == s2:
+                        # We reached destination, walk back to s1.
+                        path = []
+                        while edge is not None:
+                            path.append(edge)
+                            edge = came_from[edge.state1.id]
+                        path.reverse()
+                        logger.debug('Release (path)')
+                        return path
+                    states_to_visit.append(edge.state2)
         # No feasible path found
         logger.debug('Release (None)')
         return None
 
+    @staticmethod
+    def _path_frozen(csr, s1, s2, user):
+        """Same as path(), but runs the breadth-first search over a CSR
+        snapshot built by freeze()."""
+        row_ptr, col_idx, csr_edges, rows = csr
+        if s1.id not in rows or s2.id not in rows:
+            return None
+        src, dst = rows[s1.id], rows[s2.id]
+        # Position of the edge used to first reach each row, -1 if not reached.
+        parent = np.full(len(rows), -1, dtype=np.int32)
+        visited = np.zeros(len(rows), dtype=bool)
+        visited[src] = True
+        rows_to_visit = deque([src])
+        while len(rows_to_visit) > 0:
+            row = rows_to_visit.popleft()
+            for pos in range(row_ptr[row], row_ptr[row + 1]):
+                target = col_idx[pos]
+                if visited[target] or not csr_edges[pos].supports_user(user):
+                    continue
+                visited[target] = True
+                parent[target] = pos
+                if target == dst:
+                    # We reached destination, walk back to s1.
+                    path = []
+                    while target != src:
+                        edge = csr_edges[parent[target]]
+                        path.append(edge)
+                        target = rows[edge.state1.id]
+                    path.reverse()
+                    return path
+                rows_to_visit.append(target)
+        return None
+
     @staticmethod
     def _clean_kv(k, v):
         """Formatting key,value pairs as strings to save to gml. Replaces double
         quotes with single quotes and wraps in double quotes if the value is not
         a number (int or float)."""
+        if type(v) is int or isinstance(v, float):
+            # Numbers don't need escaping, so skip the string round trip.
+            return k.replace('"', "'"), Graph._format_number(v)
+        if isinstance(v, _HASHABLE_TYPES):
+            # The same key,value pairs show up over and over across edges.
+            return Graph._clean_hashable_kv(k, v)
+        return Graph._clean_kv_uncached(k, v)
+
+    @staticmethod
+    @lru_cache(maxsize=8192, typed=True)
+    def _clean_hashable_kv(k, v):
+        """Cached version of _clean_kv_uncached(). typed=True keeps values like
+        True, 1 and 1.0 from sharing a cache entry."""
+        return Graph._clean_kv_uncached(k, v)
+
+    @staticmethod
+    def _clean_kv_uncached(k, v):
+        """See _clean_kv()."""
         clean_k = k.replace('"', "'")
         clean_v = str(v).replace('"', "'")
         # wrapping non-numerics in quotes
         if not Graph._is_number(clean_v):
             clean_v = f'"{clean_v}"'
         elif "e" in clean_v:
-            # Converting scientific notation to decimal in output
-            tmp_v = float(clean_v)
-            decimal_places = int(clean_v.split("e-")[1])
-            clean_v = f'{tmp_v:.{decimal_places}f}'
+            clean_v = Graph._format_number(float(clean_v))
 
         # Removing any ascii characters if they are present
-        clean_v = clean_v.encode('ascii', errors='ignore').decode()
+        if not clean_v.isascii():
+            clean_v = clean_v.encode('ascii', errors='ignore').decode()
 
         return clean_k, clean_v
 
+    @staticmethod
+    def _format_number(v):
+        """Formats an int or float for gml. Non-finite floats are quoted like
+        any other non-numeric value."""
+        if type(v) is int:
+            return str(v)
+        if not math.isfinite(v):
+            return f'"{v}"'
+        # float.__repr__ gives the shortest round-trippable digits, also for
+        #  float subclasses such as numpy.float64.
+        text = float.__repr__(v)
+        if 'e' not in text:
+            return text
+        # Converting scientific notation to decimal in output
+        exponent = int(text.split('e')[1])
+        if exponent < 0:
+            return f'{v:.{-exponent}f}'
+        return f'{v:.1f}'
+
     @staticmethod
     def _is_number(value):
-        """Using this solution: https://stackoverflow.com/q/354038"""
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+        """Whether the string is an int or float literal."""
+        return _NUM_RE.match(value) is not None
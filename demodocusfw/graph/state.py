@@ -22,6 +22,7 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+import itertools
 import logging
 from pathlib import Path
 from threading import Lock
@@ -35,13 +36,17 @@ logger = logging.getLogger('crawler.graph.state')
 class State:
     """A specific configuration of content.
     """
-    auto_inc = 0
+    # Graphs can hold many states, so skip the per-instance __dict__.
+    __slots__ = ('id', 'data', 'user_paths')
+
+    # next() on an itertools.count is atomic under the GIL, so ids can be
+    #  handed out without a lock.
+    _counter = itertools.count()
+    # Shared by all states; only needed to record user paths.
+    _user_path_lock = Lock()
 
     def __init__(self, state_data):
-        self.lock = Lock()
-        with self.lock:
-            self.id = State.auto_inc
-            State.auto_inc += 1
+        self.id = next(State._counter)
         self.data = state_data
         self.user_paths = dict()  # Store how each type of user can get here.
 
@@ -85,10 +90,10 @@ class State:
             user: user (instance of UserModel) or user name as string
             path: The path to get to this state.
         """
-        with self.lock:
+        with State._user_path_lock:
             # Mark that the user can reach this state.
             if user.get_name() not in self.user_paths:
-                logger.debug('Setting user path: {}, {}'.format(user, path))
+                logger.debug('Setting user path: %s, %s', user, path)
                 self.user_paths[user.get_name()] = path
 
     def supports_user(self, user):
@@ -137,7 +142,7 @@ class State:
     @classmethod
     def reset_inc(cls, new_id=0):
         """Reset counter to 0 or another starting id."""
-        cls.auto_inc = new_id
+        cls._counter = itertools.count(new_id)
 
     def save(self, state_output_dir):
         """Save the state to its own file
@@ -157,6 +162,8 @@ class StateData:
     What is the extension to save a state to a file? What information is saved?
     The StateData gets stored inside graph states as state.data.
     StateData can be overrided by an interface, and again by an app_context"""
+    # Subclasses that declare their own __slots__ skip the per-instance __dict__.
+    __slots__ = ('stub', '_full_repr')
 
     state_ext = "json"
 
@@ -166,6 +173,7 @@ class StateData:
         to reproduce or recover the state, and whatever
         is needed to distinguish one state from another. """
         self.stub = False
+        self._full_repr = None  # Cached get_full_representation()
         # Maybe also store javascript variables, cookies, session?
 
     def __str__(self):
@@ -173,21 +181,29 @@ class StateData:
         return self.get_short_representation()
 
     def __eq__(self, other):
-        """This just calls the compare pipeline which is set up in your config file. """
-        return Comparer.compare(self.get_full_representation(),
-                                other.get_full_representation())
+        """Calls the compare pipeline which is set up in your config file,
+        unless the full representations are identical. """
+        full_repr, other_full_repr = self.get_full_representation(), other.get_full_representation()
+        # Identical representations match under any pipeline, so skip it.
+        if full_repr == other_full_repr:
+            return True
+        return Comparer.compare(full_repr, other_full_repr)
         # TODO: Think about rewriting the Comparators to take a whole StateData.
 
+    def __hash__(self):
+        """Hash on the index key, so equal state datas always hash the same."""
+        return hash(self.get_index_key())
+
     def save(self, state_id, state_output_dir):
-        # Save the output representation
+        # Save the output representation. Encode up front so each file is
+        #  written with a single call instead of chunked text-mode writes.
         state_fname = Path(state_output_dir) / f'state-{state_id}.{self.state_ext}'
-        with open(state_fname, 'w', encoding='utf-8') as fp:
-            fp.write(self.get_output_representation())
+        state_fname.write_bytes(self.get_output_representation().encode('utf-8'))
 
         # Save the output fields to json
         state_fields_fname = Path(state_output_dir) / f'state-fields-{state_id}.json'
-        with open(state_fields_fname, 'w', encoding='utf-8') as fp:
-            json.dump(self.get_output_fields(), fp, indent=2)
+        state_fields_fname.write_bytes(
+            json.dumps(self.get_output_fields(), indent=2).encode('utf-8'))
 
     def get_short_representation(self):
         """Return a short human-readable string for identifying the state in reports or debugging. """
@@ -195,9 +211,23 @@ class StateData:
 
     def get_full_representation(self):
         """Return a full representation of the state that can be used for distinguishing one state
-        from another. """
+        from another. This is compared against every candidate state, so it is computed once and
+        cached; subclasses should override _compute_full_representation() instead."""
+        if self._full_repr is None:
+            self._full_repr = self._compute_full_representation()
+        return self._full_repr
+
+    def _compute_full_representation(self):
+        """Compute the representation returned by get_full_representation()."""
         return "Please define the StateData for your particular Access class."
 
+    def get_index_key(self):
+        """Return a hashable key used to narrow down which states need to be
+        compared against this one. Two state datas that are equal must have the
+        same key. Since the compare pipeline may be fuzzy, by default every
+        state data shares a single key."""
+        return None
+
     def get_output_representation(self):
         """Returns representation of the state to save to a file."""
         return "Please define the StateData for your particular Access class."
@@ -6,6 +6,7 @@ from .test_crawler import *
 # Note: event_tracking must be imported prior to dom_manipulations
 from .event_tracking import *
 from .dom_manipulations import *
+from .graph import *
 from .keyboard_crawl import *
 from .reachable import *
 from .reduced_crawl import *
@@ -27,10 +27,12 @@ import time
 import unittest
 
 from .config import mode_crawler_single as config
+from .utils import requires_chrome
 from demodocusfw.web.utils import serve_output_folder
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestAnimation(unittest.TestCase):
     """
     This unit test tests several different kinds and speeds of animations to make sure
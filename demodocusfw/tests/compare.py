@@ -41,16 +41,12 @@ class TestCompare(unittest.TestCase):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
 
+    # Every comparator ignores whitespace between tags, so skip the indentation.
+    _HTML_PREFIX = '<html><head></head><body>'
+    _HTML_SUFFIX = '</body></html>'
+
     def _createHtml(self, html):
-        return """
-        <html>
-            <head>
-            </head>
-            <body>
-                {}
-            </body>
-        </html>
-        """.format(html)
+        return self._HTML_PREFIX + html + self._HTML_SUFFIX
 
     def _compareStates(self, file_path):
 
@@ -67,24 +63,19 @@ class TestCompare(unittest.TestCase):
         comparer = Comparer()
         errorList = []
 
-        for i in range(0, len(file_content['recordings'])):
-            html1 = file_content['recordings'][i]
-
-            equivalent_array = []
-            for array in file_content['equivalent']:
-                if(i in array):
-                    equivalent_array = array
-                    break
-
-            for x in range(0, len(file_content['recordings'])):
-                html2 = file_content['recordings'][x]
-
-                try:
-                    if i == x or x in equivalent_array:
-                        self.assertTrue(comparer.compare(html1, html2, test_pipeline))
-                    else:
-                        self.assertFalse(comparer.compare(html1, html2, test_pipeline))
-                except AssertionError:
+        recordings = file_content['recordings']
+        # Map each recording to its (first) equivalence class; recordings not
+        #  listed in any class are only equivalent to themselves.
+        class_of = {}
+        for class_id, array in enumerate(file_content['equivalent']):
+            for i in array:
+                class_of.setdefault(i, class_id)
+
+        matches = comparer.compare_batch(recordings, test_pipeline)
+        for i in range(len(recordings)):
+            for x in range(i + 1, len(recordings)):
+                expected = i in class_of and class_of[i] == class_of.get(x)
+                if matches[i][x] != expected:
                     errorList.append(f'Error comparing state {i} and state {x}')
 
         if len(errorList) > 0:
@@ -203,9 +194,37 @@ class TestCompare(unittest.TestCase):
         dist_func = FlexibleTextComparator.levenshtein_distance
         self.assertTrue(FlexibleTextComparator(dist_func, max_operations = 1).match(html1, html2))
 
+    def test_FlexibleTextComparator_levenshtein_length_changed(self):
+        """ A length change beyond max_operations should be detected. """
+        html1 = self._createHtml("""<div>Hello world</div>""")
+        html2 = self._createHtml("""<div>Hello world, and welcome to the page</div>""")
+        dist_func = FlexibleTextComparator.levenshtein_distance
+        self.assertFalse(FlexibleTextComparator(dist_func, max_operations = 10).match(html1, html2))
+
+    def test_FlexibleTextComparator_levenshtein_no_text(self):
+        """ Two states without any text should match. """
+        html1 = self._createHtml("""<div id="test"></div>""")
+        html2 = self._createHtml("""<div id="test2"></div>""")
+        dist_func = FlexibleTextComparator.levenshtein_distance
+        self.assertTrue(FlexibleTextComparator(dist_func).match(html1, html2))
+
 
     """ Pipelines """
 
+    def test_compare_batch(self):
+        html1 = self._createHtml("""<div id="test" class="test" style="display:none;">Hello world</div>""")
+        html2 = self._createHtml("""<div id="test" class="test" style="display:block;">Hello world</div>""")
+        html3 = self._createHtml("""<div id="test" class="test" style="display:none;">Goodbye</div>""")
+        test_pipeline = [
+            (StrictComparator(),          CompareFlag.STOP_IF_TRUE),
+            (DOMStructureComparator(),    CompareFlag.STOP_IF_FALSE),
+            (TextComparator(),            CompareFlag.STOP_IF_FALSE)
+        ]
+        self.assertEqual(Comparer.compare_batch([html1, html2, html3], test_pipeline),
+                         [[True, True, False],
+                          [True, True, False],
+                          [False, False, True]])
+
     def test_pipeline1(self):
         html1 = self._createHtml("""<div id="test" class="test" style="display:none;">Hello world</div>""")
         html2 = self._createHtml("""<div id="test" class="test" style="display:none;">Hello world!</div>""")
@@ -22,6 +22,8 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+import os
+
 from demodocusfw.config.mode_accessibility import *
 from demodocusfw.utils import DemodocusTemporaryDirectory
 
@@ -34,6 +36,10 @@ SCREENSHOTS = False
 
 HEADLESS = True
 
+# Set DEM_SELENIUM_REMOTE_URL to run the tests on a Selenium server, like the one
+#  in docker-compose.test.yml, instead of starting chromedriver over and over.
+REMOTE_WEBDRIVER_URL = os.environ.get('DEM_SELENIUM_REMOTE_URL')
+
 REDUCED_CRAWL = False
 
 # To check for changing and delayed content. We load the page multiple times and
@@ -22,7 +22,9 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+from collections import Counter
 import logging
+from operator import attrgetter
 import os
 from sys import stdout
 import unittest
@@ -30,7 +32,7 @@ import unittest
 import networkx as nx
 
 from .config import mode_crawler_single as config
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.comparator import Comparer
 from demodocusfw.controller import Controller
 from demodocusfw.utils import set_up_logging
@@ -39,35 +41,88 @@ from demodocusfw.web.user import OmniUser
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
-class TestCrawlGraph(unittest.TestCase):
+@requires_chrome
+class _CrawlGraphTestCase(unittest.TestCase):
+    """Shared setup for the crawl graph tests: a web server for the sandbox
+    and one Chrome-backed controller per class."""
 
     url_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}/example.html'
 
     @classmethod
     def setUpClass(cls):
         set_up_logging(logging.INFO)
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
         Comparer.default_pipeline = config.COMPARE_PIPELINE
+        # Graphs built by _get_built_graph(), by (url, user name)
+        cls._built_graphs = {}
+        # Starting Chrome is slow, so all tests share one controller.
+        cls.controller = Controller(ChromeWebAccess, config)
 
     @classmethod
     def tearDownClass(cls):
-        cls._server.stop()
+        cls.controller.stop()
+        config.OUTPUT_DIR.cleanup()
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        self.controller = Controller(ChromeWebAccess, config)
-
-    def tearDown(self):
-        config.OUTPUT_DIR.cleanup()
-        self.controller.stop()
+        self.controller.reset_graph()
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
+
+    def _get_built_graph(self, url, user):
+        """Builds the graph for url once per class, for tests that only read
+        it. The graph is frozen, since these tests search it a lot."""
+        key = (url, user.get_name())
+        if key not in self._built_graphs:
+            self.controller.access.load(url)
+            g = self.controller.build_graph(user)
+            g.freeze()
+            self._built_graphs[key] = g
+        return self._built_graphs[key]
+
+    def _assert_gml_edges(self, g, nxg):
+        """Asserts the gml file read into nxg has the same edges as g."""
+        # count by hand so we can compare w/get_edges()
+        expected = Counter((edge.state1.id, edge.state2.id)
+                           for edge_set in g.edges.values() for edge in edge_set)
+        actual = Counter((s1, s2) for s1, s2, _ in nxg.edges(keys=True))
+        self.assertEqual(expected, actual)
+        self.assertEqual(len(g.get_edges()), len(nxg.edges))
+
+    def _assert_gml_round_trip(self, g):
+        """Writes g to a gml file and checks the file has the same states
+        and edges."""
+        # Ensure gml file is written and has expected values
+        gml_filename = '{}.gml'.format(self._testMethodName)
+        # Repeat w/ and w/o user name in to_gml() to test fix for #20
+        g.to_gml(OmniUser, gml_filename)
+        nxg = nx.read_gml(gml_filename)
+        self.assertEqual(len(g.states), len(nxg.nodes))
+        self._assert_gml_edges(g, nxg)
+        os.remove(gml_filename)
+
+    def _crawl_with_new_controller(self, url):
+        """Crawl a graph built by one controller with a different controller."""
+        self.controller.load(url)
+        ouser = OmniUser
+        g = self.controller.build_graph(user=ouser)
+        nuser = VizMouseKeyUser
+        controller2 = Controller(ChromeWebAccess, config)
+        try:
+            controller2.build_user = ouser
+            controller2.load(url)
+            controller2.crawl_graph(user=nuser, graph=g)
+        finally:
+            controller2.stop()
+
+
+class TestCrawlGraph(_CrawlGraphTestCase):
 
     def _test_short_list_accessible_2_paths(self, g, min_id, user):
         """Helper function for asserts with the short URL version of
@@ -88,6 +143,78 @@ class TestCrawlGraph(unittest.TestCase):
         self.assertEqual(2, len(g.path(s1, s2, user)))
         self.assertEqual(2, len(g.path(s2, s1, user)))
 
+    def test_list_accessible_2(self):
+        """Can we find paths between arbitrary states?"""
+        url = self.format_url('test/list_accessible_2')
+        user = OmniUser
+        g = self._get_built_graph(url, user)
+        self.assertTrue('Accessible List' in g.start_state.data.dom)
+
+        # check status of states
+        self.assertEqual(len(g.states), 4)
+        for s in list(g.states):
+            self.assertEqual(url, s.data.url)
+            self.assertTrue(s.supports_user(user.get_name()))
+            self.assertIn(user.get_name(), s.user_paths)
+        s1, s2, s3, s4 = list(g.states)
+        self.assertNotEqual(s1.data.dom, s2.data.dom)
+        self.assertNotEqual(s1.data.dom, s3.data.dom)
+        self.assertNotEqual(s1.data.dom, s4.data.dom)
+        self.assertNotEqual(s2.data.dom, s3.data.dom)
+        self.assertNotEqual(s2.data.dom, s4.data.dom)
+        self.assertNotEqual(s3.data.dom, s4.data.dom)
+
+        # check status of edges
+        self.assertEqual(len(g.edges), 4)  # 4 entries (the "submitted" state has no outgoing edges)
+        edges = g.get_edges()
+        e = edges[0]  # Shouldn't really assume anything about this edge other than supported user.
+        self.assertTrue(e.supports_user(user.get_name()))
+
+        # Note: states might not be numbered from 0, so get the min id and
+        # recalc based on it
+        min_id = min(g.get_states(), key=attrgetter('id')).id
+        # Assumes crawling in deterministic order, consistent state ids
+        # relative to the graph
+        self._test_short_list_accessible_2_paths(g, min_id, user)
+
+        self._assert_gml_round_trip(g)
+
+    def test_list_partaccessible_1_crawl_new_controller(self):
+        """Crawl a built graph with a different controller."""
+        self._crawl_with_new_controller(self.format_url('test/list_partaccessible_1'))
+
+    def test_stub_state(self):
+        """Do we capture a stub state when crawling a site with a link to a
+        different URL? And does this output properly to the gml file?"""
+        url = self.format_url('test/stub_state')
+        user = OmniUser
+        g = self._get_built_graph(url, user)
+        # TODO: switch to tempfile.mkstemp() or equivalent
+        gml_filename = '{}.gml'.format(self._testMethodName)
+        # Repeat w/ and w/o user name in to_gml() to test fix for #20
+        g.to_gml(OmniUser, gml_filename)
+        nxg = nx.read_gml(gml_filename)
+
+        # Counting number of stub states in graph object
+        g_num_stubs = sum([s.stub for s in g.get_states()])
+        self.assertEqual(g_num_stubs, 1)
+
+        # Counting number of stub states in gml file
+        nxg_num_stubs = sum([1 for stub in nxg.nodes(data='stub')
+                             if stub[1] == "True"])
+        self.assertEqual(nxg_num_stubs, 1)
+
+        # Assert other graph/gml equivalencies
+        self.assertEqual(len(g.states), len(nxg.nodes))
+        self._assert_gml_edges(g, nxg)
+        os.remove(gml_filename)
+
+
+@unittest.skipUnless(os.environ.get('DEM_RUN_EXTENDED') == 'True',
+                     'set DEM_RUN_EXTENDED=True to crawl the extended corpus')
+class TestCrawlGraphExtended(_CrawlGraphTestCase):
+    """The crawl graph tests against the larger examples in the sandbox."""
+
     def _test_extended_list_accessible_2_paths(self, g, min_id, user):
         """Helper function for asserts with the short URL version of
         test_list_accessible_2_paths().
@@ -118,118 +245,31 @@ class TestCrawlGraph(unittest.TestCase):
 
     def test_list_accessible_2(self):
         """Can we find paths between arbitrary states?"""
-        if os.environ.get('DEM_RUN_EXTENDED') == 'True':
-            url = self.format_url('list/accessible_2')
-        else:
-            url = self.format_url('test/list_accessible_2')
-
-        self.controller.access.load(url)
-        self.assertTrue('Accessible List' in self.controller.access._driver.title)
+        url = self.format_url('list/accessible_2')
         user = OmniUser
-        g = self.controller.build_graph(user)
+        g = self._get_built_graph(url, user)
+        self.assertTrue('Accessible List' in g.start_state.data.dom)
 
         # check status of states
-        if os.environ.get('DEM_RUN_EXTENDED') == 'True':
-            self.assertEqual(len(g.states), 16)
-            self.assertEquals(len(g.edges), 16)
-            edges = g.get_edges()
-            self.assertEquals(len(edges), 192)
-            e = edges[0]
-            self.assertTrue(e.supports_user(user.get_name()))
-        else:
-            self.assertEqual(len(g.states), 4)
-            for s in list(g.states):
-                self.assertEqual(url, s.data.url)
-                self.assertTrue(s.supports_user(user.get_name()))
-                self.assertIn(user.get_name(), s.user_paths)
-            s1, s2, s3, s4 = list(g.states)
-            self.assertNotEqual(s1.data.dom, s2.data.dom)
-            self.assertNotEqual(s1.data.dom, s3.data.dom)
-            self.assertNotEqual(s1.data.dom, s4.data.dom)
-            self.assertNotEqual(s2.data.dom, s3.data.dom)
-            self.assertNotEqual(s2.data.dom, s4.data.dom)
-            self.assertNotEqual(s3.data.dom, s4.data.dom)
-
-            # check status of edges
-            self.assertEqual(len(g.edges), 4)  # 4 entries (the "submitted" state has no outgoing edges)
-            edges = g.get_edges()
-            e = edges[0]  # Shouldn't really assume anything about this edge other than supported user.
-            self.assertTrue(e.supports_user(user.get_name()))
+        self.assertEqual(len(g.states), 16)
+        self.assertEqual(len(g.edges), 16)
+        edges = g.get_edges()
+        self.assertEqual(len(edges), 192)
+        e = edges[0]
+        self.assertTrue(e.supports_user(user.get_name()))
 
         # Note: states might not be numbered from 0, so get the min id and
         # recalc based on it
-        min_id = sorted(g.get_states(), key=lambda s: s.id)[0].id
+        min_id = min(g.get_states(), key=attrgetter('id')).id
         # Assumes crawling in deterministic order, consistent state ids
         # relative to the graph
-        if os.environ.get('DEM_RUN_EXTENDED') == 'True':
-            self._test_extended_list_accessible_2_paths(g, min_id, user)
-        else:
-            self._test_short_list_accessible_2_paths(g, min_id, user)
+        self._test_extended_list_accessible_2_paths(g, min_id, user)
 
-        # Ensure gml file is written and has expected values
-        gml_filename = '{}.gml'.format(self._testMethodName)
-        # Repeat w/ and w/o user name in to_gml() to test fix for #20
-        g.to_gml(OmniUser, gml_filename)
-        nxg = nx.read_gml(gml_filename)
-        self.assertEqual(len(g.states), len(nxg.nodes))
-        # count by hand so we can compare w/get_edges()
-        edge_count = 0
-        for state, edge_set in g.edges.items():
-            for edge in edge_set:
-                self.assertIn((edge.state1.id, edge.state2.id), nxg.edges)
-                edge_count += 1
-        self.assertEqual(edge_count, len(nxg.edges))
-        self.assertEqual(len(g.get_edges()), len(nxg.edges))
-        os.remove(gml_filename)
+        self._assert_gml_round_trip(g)
 
     def test_list_partaccessible_1_crawl_new_controller(self):
         """Crawl a built graph with a different controller."""
-        if os.environ.get('DEM_RUN_EXTENDED') == 'True':
-            url = self.format_url('list/partaccessible_1')
-        else:
-            url = self.format_url('test/list_partaccessible_1')
-        self.controller.load(url)
-        ouser = OmniUser
-        g = self.controller.build_graph(user=ouser)
-        nuser = VizMouseKeyUser
-        controller2 = Controller(ChromeWebAccess, config)
-        controller2.build_user = ouser
-        controller2.load(url)
-        controller2.crawl_graph(user=nuser, graph=g)
-
-    def test_stub_state(self):
-        """Do we capture a stub state when crawling a site with a link to a
-        different URL? And does this output properly to the gml file?"""
-        url = self.format_url('test/stub_state')
-        self.controller.access.load(url)
-        user = OmniUser
-        g = self.controller.build_graph(user)
-        # TODO: switch to tempfile.mkstemp() or equivalent
-        gml_filename = '{}.gml'.format(self._testMethodName)
-        # Repeat w/ and w/o user name in to_gml() to test fix for #20
-        g.to_gml(OmniUser, gml_filename)
-        nxg = nx.read_gml(gml_filename)
-
-        # Counting number of stub states in graph object
-        g_num_stubs = sum([s.stub for s in g.get_states()])
-        self.assertEqual(g_num_stubs, 1)
-
-        # Counting number of stub states in gml file
-        nxg_num_stubs = sum([1 for stub in nxg.nodes(data='stub')
-                             if stub[1] == "True"])
-        self.assertEqual(nxg_num_stubs, 1)
-
-        # Assert other graph/gml equivalencies
-        self.assertEqual(len(g.states), len(nxg.nodes))
-        # count by hand so we can compare w/get_edges()
-        edge_count = 0
-        for state, edge_set in g.edges.items():
-            for edge in edge_set:
-                self.assertIn((edge.state1.id, edge.state2.id), nxg.edges)
-                edge_count += 1
-        self.assertEqual(edge_count, len(nxg.edges))
-        self.assertEqual(len(g.get_edges()), len(nxg.edges))
-        os.remove(gml_filename)
+        self._crawl_with_new_controller(self.format_url('list/partaccessible_1'))
 
 
 if __name__ == '__main__':
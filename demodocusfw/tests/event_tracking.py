@@ -26,14 +26,14 @@ from sys import stdout
 import unittest
 
 from .config import mode_crawler_single as config
-from demodocusfw.web.server import ThreadedHTTPServer
-from demodocusfw.crawler import Crawler
+from .utils import get_sandbox_server, requires_chrome
+from demodocusfw.comparator import Comparer
+from demodocusfw.crawler import Crawl, crawl_one
 from demodocusfw.web import dom_manipulations
 from demodocusfw.web.dom_manipulations import REACHABLE_ATT_NAME
-from demodocusfw.web.utils import serve_output_folder
-from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestEventTracking(unittest.TestCase):
     event_code = "console.log('Test');"
 
@@ -42,43 +42,61 @@ class TestEventTracking(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         # Set up a server to serve up the examples.
-        cls.examples_server = ThreadedHTTPServer('localhost', 0)
+        cls.examples_server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls.examples_server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls.examples_server.start()
+        cls._ep_template = cls.ep_template.format(cls.server_ip, cls.server_port, '{}')
+        # Starting Chrome is slow, so all tests share the one in this controller.
+        #  It also serves up the output data. The css pseudo class tests crawl
+        #  with it, and the others drive its web access directly.
+        Comparer.default_pipeline = config.COMPARE_PIPELINE
+        cls.controller = config.ACCESS_CLASS.make_controller(config)
 
     @classmethod
     def tearDownClass(cls):
-        cls.examples_server.stop()
+        cls.controller.stop()
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        # Set up a server to serve up output data.
-        self.output_server = serve_output_folder(config)
-        # Now create the web access.
-        self.web_access = ChromeWebAccess(config)
-        self.web_access._create_driver(config)
+        self.web_access = self.controller.access
+        if self.web_access._driver is None:
+            self.web_access._create_driver(config)
+        # Start each test from a blank page, with nothing left over from the last one.
+        self.web_access.reset()
+        self.web_access._driver.get('about:blank')
+        self.web_access._driver.delete_all_cookies()
 
     def tearDown(self):
-        self.web_access.shutdown()
-        self.output_server.stop()
         config.OUTPUT_DIR.cleanup()
 
     def format_ep(self, path):
-        return self.ep_template.format(self.server_ip, self.server_port, path)
+        return self._ep_template.format(path)
+
+    def _crawl(self, path):
+        """Crawls the example at path, as Crawler.crawl_all() would, and returns the graph."""
+        self.controller.reset_graph()
+        crawl_one(self.controller, self.format_ep(path), Crawl(), config.BUILD_USER, config.CRAWL_USERS)
+        return self.controller.graph
 
     def _inject_code(self, html_code):
         html_code = dom_manipulations.manage_event_listeners(html_code)
         self.assertTrue(self.web_access.set_page_source(html_code))
 
+    def _assert_first_event_xpath(self, js_event_type, xpath):
+        # Only the first element is needed, so don't fetch all of them from the browser.
+        element = self.web_access.get_elements_supporting_js_event(js_event_type, find_one=True)
+        if element is None:
+            self.fail(f'No element supports {js_event_type}')
+        self.assertEqual(element.xpath, xpath)
+
     def test_event_as_jQuery(self):
         """Tests whether we capture the click event when added with jquery."""
         js = "$('#button').click(function() { " + self.event_code + " });"
         html_code = f"""<html><head><script src="https://ajax.googleapis.com/ajax/libs/jquery/3.2.1/jquery.min.js"></script></head><body><button id="button" {REACHABLE_ATT_NAME}="true"></button><script>{js}</script></body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('click'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('click', "/html/body/button")
 
     def test_event_hover_jquery(self):
         """Tests whether we capture the hover event when added with jquery"""
@@ -91,28 +109,28 @@ class TestEventTracking(unittest.TestCase):
             });"""
         html_code = f"""<html><head><script src="https://ajax.googleapis.com/ajax/libs/jquery/3.2.1/jquery.min.js"></script></head><body><button id="button" {REACHABLE_ATT_NAME}="true"></button><script>{js}</script></body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('mouseover'))[0].xpath == "/html/body/button")
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('mouseout'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('mouseover', "/html/body/button")
+        self._assert_first_event_xpath('mouseout', "/html/body/button")
 
     def test_event_as_js_onclick(self):
         """Tests whether we capture the click event when added with javascript property."""
         js = "document.getElementById('button').onclick = function() { " + self.event_code + " };"
         html_code = f"""<html><head></head><body><button id="button" {REACHABLE_ATT_NAME}="true"></button><script>{js}</script></body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('click'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('click', "/html/body/button")
 
     def test_event_as_addEventListener(self):
         """Tests whether we capture the click event when added with the addEventListener function."""
         js = "document.getElementById('button').addEventListener('click', function() { " + self.event_code + " });"
         html_code = f"""<html><head></head><body><button id="button" {REACHABLE_ATT_NAME}="true"></button><script>{js}</script></body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('click'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('click', "/html/body/button")
 
     def test_event_as_attribute(self):
         """Tests whether we capture the click event when added as an attribute."""
         html_code = f"""<html><head></head><body><button id="button" {REACHABLE_ATT_NAME}="true" onclick="{self.event_code}"></button></body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('click'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('click', "/html/body/button")
 
     def test_event_before_append(self):
         """Tests whether we capture the click event if it is set before the element is added to the page."""
@@ -128,76 +146,36 @@ class TestEventTracking(unittest.TestCase):
         </script>
         </body></html>"""
         self._inject_code(html_code)
-        self.assertTrue(list(self.web_access.get_elements_supporting_js_event('click'))[0].xpath == "/html/body/button")
+        self._assert_first_event_xpath('click', "/html/body/button")
 
-    def test_css_pseudo_hover_list(self):
-        # Test base case of a list being expanded, this is the simplest pseudo class case
+    # (example, number of states) for each css pseudo class example.
+    css_pseudo_hover_cases = [
+        # Base case of a list being expanded, this is the simplest pseudo class case
         # Form: Selector:hover Applied
-        url = "hover_list"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
-        self.assertEqual(2, len(crawler.controller.graph.get_states()))
-
-    def test_css_pseudo_hover_list_combo_child(self):
-        # Tests for having combos of
+        ("hover_list", 2),
+        # Combos of selectors
         # Example Form: .dropdown:hover ul, .dropdown2:hover > ul {style}
-
-        url = "hover_list_combo_child"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
         # There are three states: 0, first list expanded, second list expanded.
-        self.assertEqual(3, len(crawler.controller.graph.get_states()))
-
-    def test_css_pseudo_hover_list_not(self):
-        # Tests for pairing additional pseudo classes
+        ("hover_list_combo_child", 3),
+        # Pairing additional pseudo classes
         # Example form: .dropdown:hover:not(#nodrop):not(.nodrop) .dropdown-content
-
-        url = "hover_list_not"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
-        # There are three states: 0, first list expanded, second list expanded.
-        self.assertEqual(3, len(crawler.controller.graph.get_states()))
-
-    def test_css_pseudo_hover_list_media(self):
-        # Tests for css rules that may use media rules
+        ("hover_list_not", 3),
+        # Css rules that may use media rules
         # Example form: @media screen and (min-width: 200px) {selector:hover {styling}}
-
-        url = "hover_list_media"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
-        # There are three states: 0, first list expanded, second list expanded.
-        self.assertEqual(3, len(crawler.controller.graph.get_states()))
-
-    def test_css_pseudo_hover_list_sibling(self):
-        # Tests for css that use sibling selector (+)
+        ("hover_list_media", 3),
+        # Css that use sibling selector (+)
         # Example form: div + ul {style}
-
-        url = "hover_list_sibling"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
-        self.assertEqual(2, len(crawler.controller.graph.get_states()))
-
-    def test_css_pseudo_hover_list_preceded(self):
-        # Tests for css that use precedence selector (~)
+        ("hover_list_sibling", 2),
+        # Css that use precedence selector (~)
         # Example form: div ~ ul {style}
-
-        url = "hover_list_preceded"
-        entry_point = self.format_ep(url)
-        crawler = Crawler(config)
-        crawler.crawl_all([entry_point])
-
-        self.assertEqual(2, len(crawler.controller.graph.get_states()))
-
+        ("hover_list_preceded", 2),
+    ]
+
+    def test_css_pseudo_hover(self):
+        for url, num_states in self.css_pseudo_hover_cases:
+            with self.subTest(url=url):
+                graph = self._crawl(url)
+                self.assertEqual(num_states, len(graph.get_states()))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,197 @@
+"""
+Software License Agreement (Apache 2.0)
+
+Copyright (c) 2020, The MITRE Corporation.
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This project was developed by The MITRE Corporation.
+If this code is used in a deployment or embedded within another project,
+it is requested that you send an email to opensource@mitre.org in order to
+let us know where this software is being used.
+"""
+
+from pathlib import Path
+from sys import stdout
+import unittest
+
+import networkx as nx
+
+from demodocusfw.build_data import BuildData
+from demodocusfw.graph import EdgeMetrics, Graph
+from demodocusfw.utils import DemodocusTemporaryDirectory
+from demodocusfw.web.state import WebStateData
+from demodocusfw.web.user import OmniUser
+
+
+class TestGraph(unittest.TestCase):
+
+    url = 'http://localhost/example.html'
+
+    def setUp(self):
+        stdout.write('{}\n'.format(self._testMethodName))
+        stdout.flush()
+        self.graph = Graph()
+
+    @staticmethod
+    def _create_html(i):
+        # Vary the structure, not just the text, so states don't match.
+        return '<html><body>{}</body></html>'.format('<p>text</p>' * (i + 1))
+
+    def _add_state(self, i):
+        was_added, state = self.graph.add_state(WebStateData(self.url, self._create_html(i)))
+        return state
+
+    def _add_edge(self, s1, s2, element='el', action='click', user=OmniUser):
+        edge = self.graph.add_edge(s1, s2, element, action)
+        edge_metrics = EdgeMetrics()
+        edge_metrics.ability_score = 1.0
+        edge_metrics.build_data = BuildData()
+        edge.add_data_for_user(user, edge_metrics)
+        return edge
+
+    def test_add_state(self):
+        s0 = self._add_state(0)
+        s1 = self._add_state(1)
+        was_added, state = self.graph.add_state(WebStateData(self.url, self._create_html(0)))
+        self.assertFalse(was_added)
+        self.assertEqual(state, s0)
+        self.assertEqual(self.graph.start_state, s0)
+        self.assertEqual(len(self.graph.get_states()), 2)
+        self.assertEqual(self.graph.find_state_by_id(s1.id), s1)
+        self.assertIsNone(self.graph.find_state_by_id(-1))
+        # Same dom at a different url path is a different state.
+        was_added, state = self.graph.add_state(
+            WebStateData('http://localhost/other.html', self._create_html(0)))
+        self.assertTrue(was_added)
+
+    def test_contains(self):
+        s0, s1 = [self._add_state(i) for i in range(2)]
+        e1 = self._add_edge(s0, s1)
+        self.assertIn(s0, self.graph)
+        self.assertIn(e1, self.graph)
+        self.assertIn(WebStateData(self.url, self._create_html(1)), self.graph)
+        self.assertNotIn(WebStateData(self.url, self._create_html(2)), self.graph)
+        other = Graph(reset_state_inc=False)
+        s2 = other.add_state(WebStateData(self.url, self._create_html(2)))[1]
+        self.assertNotIn(s2, self.graph)
+        self.assertNotIn(other.add_edge(s1, s2, 'el', 'click'), self.graph)
+        self.assertNotIn('<html></html>', self.graph)
+
+    def test_get_edges(self):
+        s0, s1, s2 = [self._add_state(i) for i in range(3)]
+        e1 = self._add_edge(s0, s1)
+        e2 = self._add_edge(s1, s2)
+        # Adding the same edge twice does not duplicate it.
+        self.graph.add_edge(s0, s1, 'el', 'click')
+        self.assertEqual(self.graph.get_edges(), [e1, e2])
+        self.assertEqual(self.graph.get_edge_between_states(s1, s2), e2)
+
+    def test_path(self):
+        self._test_path(freeze=False)
+
+    def test_path_frozen(self):
+        self._test_path(freeze=True)
+
+    def _test_path(self, freeze):
+        s0, s1, s2, s3, s4 = [self._add_state(i) for i in range(5)]
+        e01 = self._add_edge(s0, s1)
+        e12 = self._add_edge(s1, s2)
+        e23 = self._add_edge(s2, s3)
+        e13 = self._add_edge(s1, s3, element='shortcut')
+        e31 = self._add_edge(s3, s1)
+        if freeze:
+            self.graph.freeze()
+            self.assertTrue(self.graph.is_frozen())
+        self.assertEqual(self.graph.path(s1, s1, OmniUser), [])
+        self.assertEqual(self.graph.path(s1, s2, OmniUser), [e12])
+        self.assertEqual(self.graph.path(s1, s3, OmniUser), [e13])
+        self.assertEqual(self.graph.path(s2, s1, OmniUser), [e23, e31])
+        self.assertIsNone(self.graph.path(s1, s4, OmniUser))
+        self.assertIsNone(self.graph.path(s3, s0, OmniUser))
+        # Changing the graph drops the frozen snapshot.
+        e40 = self._add_edge(s4, s0)
+        self.assertFalse(self.graph.is_frozen())
+        self.assertEqual(self.graph.path(s4, s1, OmniUser), [e40, e01])
+
+    def test_path_user(self):
+        s0, s1, s2, s3 = [self._add_state(i) for i in range(4)]
+        self._add_edge(s0, s1)
+        e12 = self._add_edge(s1, s2)
+        e23 = self._add_edge(s2, s3)
+        # Only OmniUser can take the shortcut.
+        e13 = self._add_edge(s1, s3, element='shortcut')
+        for edge in (e12, e23):
+            edge_metrics = EdgeMetrics()
+            edge_metrics.ability_score = 1.0
+            edge.add_data_for_user(_NamedUser('OtherUser'), edge_metrics)
+        self.assertEqual(self.graph.path(s1, s3, 'OtherUser'), [e12, e23])
+        self.graph.freeze()
+        self.assertEqual(self.graph.path(s1, s3, 'OtherUser'), [e12, e23])
+        # Cached paths are dropped once the user can take the shortcut.
+        edge_metrics = EdgeMetrics()
+        edge_metrics.ability_score = 1.0
+        e13.add_data_for_user(_NamedUser('OtherUser'), edge_metrics)
+        self.assertEqual(self.graph.path(s1, s3, 'OtherUser'), [e13])
+
+    def test_to_gml(self):
+        s0, s1, s2 = [self._add_state(i) for i in range(3)]
+        s0.set_user_path(OmniUser, [])
+        e01 = self._add_edge(s0, s1)
+        s1.set_user_path(OmniUser, [e01])
+        e12 = self._add_edge(s1, s2, element='/html/body/p[2]')
+        e12.user_metrics[OmniUser.get_name()].act_time = 0.00002
+        e12.user_metrics[OmniUser.get_name()].build_data.data = {
+            'count': 3, 'ratio': 0.5, 'small': 1e-07, 'large': 1e+20,
+            'text': 'say "caf\u00e9"', 'none': None}
+
+        output_dir = DemodocusTemporaryDirectory()
+        try:
+            fname = Path(output_dir.name) / 'full_graph.gml'
+            self.assertTrue(self.graph.to_gml(OmniUser, fname))
+            nxg = nx.read_gml(fname)
+            # Streaming writes the same file.
+            streamed_fname = Path(output_dir.name) / 'streamed_graph.gml'
+            self.assertTrue(self.graph.to_gml(OmniUser, streamed_fname, use_streaming=True))
+            self.assertEqual(fname.read_bytes(), streamed_fname.read_bytes())
+        finally:
+            output_dir.cleanup()
+
+        self.assertEqual(len(nxg.nodes), 3)
+        self.assertEqual(len(nxg.edges), 2)
+        self.assertEqual(nxg.graph['buildUser'], 'OmniUser')
+        self.assertEqual(nxg.nodes[s0.id]['OmniUser'], 'True')
+        self.assertEqual(nxg.nodes[s2.id]['OmniUser'], 'False')
+        self.assertEqual(nxg.nodes[s1.id]['users'], 'OmniUser')
+        edge_data = nxg.edges[s1.id, s2.id, 0]
+        self.assertEqual(edge_data['element'], '/html/body/p[2]')
+        self.assertEqual(edge_data['action'], 'click')
+        self.assertEqual(edge_data['count'], 3)
+        self.assertEqual(edge_data['ratio'], 0.5)
+        self.assertAlmostEqual(edge_data['small'], 1e-07)
+        self.assertEqual(edge_data['large'], 1e+20)
+        self.assertEqual(edge_data['text'], "say 'caf'")
+        self.assertEqual(edge_data['none'], 'None')
+        self.assertEqual(edge_data['OmniUser'], 1.0)
+        self.assertAlmostEqual(edge_data['OmniUser_act_time'], 0.00002)
+        self.assertEqual(edge_data['OmniUser_pcv_score'], 'None')
+
+
+class _NamedUser:
+    """Minimal stand-in for a UserModel."""
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
@@ -26,57 +26,58 @@ from sys import stdout
 import unittest
 
 from .config import mode_test as config
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.controller import Controller
 from demodocusfw.utils import DemodocusTemporaryDirectory
 from demodocusfw.web.user import OmniUser
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestKeyboardCrawl(unittest.TestCase):
 
     url_template = 'http://{}:{}/demodocusfw/tests/sandbox/test/event_unit_tests/{}.html'
 
     @classmethod
     def setUpClass(cls):
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
+        config.MULTI = False
+        config.NUM_THREADS = 1
+        config.OUTPUT_DIR = DemodocusTemporaryDirectory()
+        # Starting Chrome is slow, so all of the pages are crawled with one controller.
+        cls.controller = Controller(ChromeWebAccess, config)
 
     @classmethod
     def tearDownClass(cls):
-        cls._server.stop()
+        cls.controller.stop()
+        config.OUTPUT_DIR.cleanup()
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        config.MULTI = False
-        config.NUM_THREADS = 1
-        config.OUTPUT_DIR = DemodocusTemporaryDirectory()
-        self.controller = Controller(ChromeWebAccess, config)
-
-    def tearDown(self):
-        config.OUTPUT_DIR.cleanup()
-        self.controller.stop()
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
 
     def crawl(self, path):
         """Testing the basics of crawl graph result."""
         url = self.format_url(path)
+        self.controller.reset_graph()
         self.controller.access.load(url)
         user = OmniUser
         g = self.controller.build_graph(user)
 
         # check status of states
         self.assertEqual(len(g.states), 2)
-        for s in list(g.states):
-            self.assertEqual(url, s.data.url)
-            self.assertTrue(s.supports_user(user.get_name()))
-            self.assertIn(user.get_name(), s.user_paths)
+        self.assertEqual({url}, {s.data.url for s in g.states})
+        # Every state must support the user and have a path for it.
+        unsupported = {s.id for s in g.states
+                       if not s.supports_user(user.get_name()) or user.get_name() not in s.user_paths}
+        self.assertFalse(unsupported, 'States not supporting {}: {}'.format(user.get_name(), unsupported))
         s1, s2 = list(g.states)
         self.assertNotEqual(s1.data.dom, s2.data.dom)
 
@@ -92,29 +93,18 @@ class TestKeyboardCrawl(unittest.TestCase):
         self.assertTrue(e.supports_user(user.get_name()))
         # Verify that rewind is working; should find all six events on all
         # four tests.
-        for event_type in ['ArrowDown', 'ArrowLeft', 'ArrowRight',
-            'ArrowUp', 'Enter', 'Space']:
-            found_event = False
-            # print('Looking for event {}'.format(event_type))
-            for e in edges:
-                # print('...comparing to {} event'.format(e.action))
-                if event_type in str(e.action):
-                    # print(' -> found event {}'.format(event_type))
-                    found_event = True
-                    break
-            self.assertTrue(found_event)
-
-    def test_code(self):
-        self.crawl('code')
-
-    def test_key(self):
-        self.crawl('key')
-
-    def test_keyCode(self):
-        self.crawl('keyCode')
-
-    def test_which(self):
-        self.crawl('which')
+        # Graph.add_edge() already keeps each edge's action as a string.
+        action_strs = {e.action_str for e in edges}
+        missing = [event_type for event_type in ['ArrowDown', 'ArrowLeft', 'ArrowRight',
+                                                 'ArrowUp', 'Enter', 'Space']
+                   if not any(event_type in action_str for action_str in action_strs)]
+        self.assertFalse(missing, 'Missing events: {}'.format(missing))
+
+    def test_key_properties(self):
+        # Each page checks for the key with a different property of the event.
+        for path in ('code', 'key', 'keyCode', 'which'):
+            with self.subTest(path=path):
+                self.crawl(path)
 
 
 if __name__ == '__main__':
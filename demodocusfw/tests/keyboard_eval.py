@@ -26,12 +26,13 @@ from sys import stdout
 import unittest
 
 from .config import mode_test as config
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.controller import Controller
 from demodocusfw.utils import DemodocusTemporaryDirectory, set_up_logging, stop_logging
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestKeyboardEvaluation(unittest.TestCase):
 
     ep_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}'
@@ -39,11 +40,11 @@ class TestKeyboardEvaluation(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         # Server for serving up examples.
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._ep_template = cls.ep_template.format(cls.server_ip, cls.server_port, '{}')
 
         # Set up config.
         config.MULTI = False
@@ -60,11 +61,10 @@ class TestKeyboardEvaluation(unittest.TestCase):
     def tearDownClass(cls):
         stop_logging()
         cls.controller.stop()
-        cls._server.stop()
         config.OUTPUT_DIR.cleanup()
 
     def format_ep(self, path):
-        return self.ep_template.format(self.server_ip, self.server_port, path)
+        return self._ep_template.format(path)
 
     def load_and_get_tabs(self, path):
         self.controller.access.load(self.format_ep(path))
@@ -95,26 +95,17 @@ class TestKeyboardEvaluation(unittest.TestCase):
         tab_order = self.load_and_get_tabs("test/tab_order/good_order.html")
 
         # The headful and headless browsers have different default focus outlines, so we just use the px  as truth
-        self.assertTrue("1px" in tab_order["/html/body/ul/li[1]"]["focused_style_info"]["outline-style"])
-        self.assertTrue("1px" in tab_order["/html/body/ul/li[2]"]["focused_style_info"]["outline-style"])
-        self.assertTrue("1px" in tab_order["/html/body/ul/li[3]"]["focused_style_info"]["outline-style"])
-        self.assertTrue("1px" in tab_order["/html/body/ul/li[4]"]["focused_style_info"]["outline-style"])
-
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[1]"]["focused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[2]"]["focused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[3]"]["focused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[4]"]["focused_style_info"]["border-style"])
-
-        # Check the unfocused styling information
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[1]"]["unfocused_style_info"]["outline-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[2]"]["unfocused_style_info"]["outline-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[3]"]["unfocused_style_info"]["outline-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[4]"]["unfocused_style_info"]["outline-style"])
-
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[1]"]["unfocused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[2]"]["unfocused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[3]"]["unfocused_style_info"]["border-style"])
-        self.assertTrue("0px" in tab_order["/html/body/ul/li[4]"]["unfocused_style_info"]["border-style"])
+        # Compare everything at once, so a failure shows every style that was off.
+        expected_px = {"focused_style_info": {"outline-style": "1px", "border-style": "0px"},
+                       "unfocused_style_info": {"outline-style": "0px", "border-style": "0px"}}
+        xpaths = ["/html/body/ul/li[{}]".format(i) for i in range(1, 5)]
+        expected = {xpath: {info: {style: True for style in styles}
+                            for info, styles in expected_px.items()}
+                    for xpath in xpaths}
+        actual = {xpath: {info: {style: px in tab_order[xpath][info][style] for style, px in styles.items()}
+                          for info, styles in expected_px.items()}
+                  for xpath in xpaths}
+        self.assertEqual(expected, actual)
 
     def test_no_outline(self):
         tab_order = self.load_and_get_tabs("test/tab_order/no_outline.html")
@@ -26,6 +26,7 @@ from sys import stdout
 import unittest
 
 from .config import mode_test as config
+from .utils import requires_chrome
 from demodocusfw.web.dom_manipulations import (
     js_calculate_reachable,
     REACHABLE_ATT_NAME
@@ -34,11 +35,18 @@ from demodocusfw.web.utils import serve_output_folder
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestReachable(unittest.TestCase):
     """This tests helps make sure we are correctly setting the _reachable flag on elements."""
 
     node_to_insert = "<span id='test'/>"
 
+    # Calculates reachability and reads the button's flag back in one round trip.
+    #  js_calculate_reachable ends in a return (after a line comment), so it
+    #  gets its own function.
+    js_button_reachable = (f"(function() {{\n{js_calculate_reachable}\n}})();\n"
+                           f"return document.getElementById('button').getAttribute('{REACHABLE_ATT_NAME}');")
+
     @classmethod
     def setUpClass(cls):
         # Set up a server to serve up output data.
@@ -64,9 +72,8 @@ class TestReachable(unittest.TestCase):
     def _inject_and_test(self, html_code):
         # There should be a button at document/body/button[0] that is not reachable.
         self.assertTrue(self.web_access.set_page_source(html_code))
-        self.web_access.run_js(js_calculate_reachable)
-        button = self.web_access.run_js("return document.getElementById('button');")
-        self.assertEqual(button.get_attribute(REACHABLE_ATT_NAME), "false")
+        # Calculate once the page has been laid out, as the crawler does after waiting for it.
+        self.assertEqual(self.web_access.run_js_after_paint(self.js_button_reachable), "false")
 
     def test_reachable_display_none(self):
         html_code = """<html><head></head><body><button id="button" style="display:none"/></body></html>"""
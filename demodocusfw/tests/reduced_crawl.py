@@ -23,11 +23,14 @@ let us know where this software is being used.
 """
 
 import logging
+import os
+from pathlib import Path
 from sys import stdout
+from types import SimpleNamespace
 import unittest
 
 from .config import mode_crawler_single as config
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.comparator import Comparer
 from demodocusfw.utils import DemodocusTemporaryDirectory, set_up_logging
 from demodocusfw.web.controller import ControllerReduced, \
@@ -36,36 +39,43 @@ from demodocusfw.web.user import OmniUser
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestReducedCrawl(unittest.TestCase):
 
     url_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}/example.html'
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
 
     @classmethod
     def setUpClass(cls):
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
         Comparer.default_pipeline = config.COMPARE_PIPELINE
 
         # Set up logging
         set_up_logging(logging.INFO)
 
+        # One temporary directory for the class, with a subdirectory for each test.
+        cls._output_root = DemodocusTemporaryDirectory()
+        cls._output_dir = config.OUTPUT_DIR
+
     @classmethod
     def tearDownClass(cls):
-        cls._server.stop()
+        cls._output_root.cleanup()
+        config.OUTPUT_DIR = cls._output_dir
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        config.OUTPUT_DIR = DemodocusTemporaryDirectory()
-
-    def tearDown(self):
-        config.OUTPUT_DIR.cleanup()
+        output_path = Path(self._output_root.name) / self._testMethodName
+        os.makedirs(output_path)
+        # Other tests on this config expect OUTPUT_DIR to have a name and a cleanup(),
+        #  and the root directory cleans up after all of them.
+        config.OUTPUT_DIR = SimpleNamespace(name=str(output_path), cleanup=lambda: None)
 
     def test_test_partaccessible_1_crawl(self):
         """Testing the basics of crawl graph result."""
@@ -29,9 +29,10 @@ from .config import mode_test as config
 from demodocusfw.controller import Controller
 from demodocusfw.utils import DemodocusTemporaryDirectory
 from demodocusfw.web.web_access import ChromeWebAccess
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 
 
+@requires_chrome
 class TestSeleniumIntegration(unittest.TestCase):
 
     default_url = 'https://www.mitre.org/'
@@ -40,30 +41,36 @@ class TestSeleniumIntegration(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
+        # Starting Chrome is slow, so all tests share one controller.
+        config.MULTI = False
+        config.NUM_THREADS = 1
+        config.OUTPUT_DIR = DemodocusTemporaryDirectory()
+        # None of these tests look at images, so don't spend time loading them.
+        cls._load_images = config.LOAD_IMAGES
+        config.LOAD_IMAGES = False
+        cls.controller = Controller(ChromeWebAccess, config)
 
     @classmethod
     def tearDownClass(cls):
-        cls._server.stop()
+        cls.controller.stop()
+        config.LOAD_IMAGES = cls._load_images
+        config.OUTPUT_DIR.cleanup()
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        config.MULTI = False
-        config.NUM_THREADS = 1
-        config.OUTPUT_DIR = DemodocusTemporaryDirectory()
-        self.controller = Controller(ChromeWebAccess, config)
-
-    def tearDown(self):
-        self.controller.stop()
-        config.OUTPUT_DIR.cleanup()
+        # Start each test from a blank page, with nothing left over from the last one.
+        self.controller.access.reset()
+        self.controller.access._driver.get('about:blank')
+        self.controller.access._driver.delete_all_cookies()
 
     def test_controller_page_load(self):
         self.controller.access.load('http://www.google.com')
@@ -22,35 +22,36 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+import importlib.util
 import json
 import os
 from pathlib import Path
-import subprocess
-import sys
 from sys import stdout
 import unittest
 
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.crawler import import_config_from_spec, check_config_mode
-from demodocusfw.utils import DemodocusTemporaryDirectory
+from demodocusfw.utils import DemodocusTemporaryDirectory, ROOT_DIR
 from demodocusfw.web.accessibility.user import VizKeyUser
 from demodocusfw.web.analysis import WebAccessAnalyzer
 
+# x,y fields of the network layouts that every node of the full graph should have.
+POS_FIELDS = frozenset({'x_fr_0', 'x_fr_2', 'x_fr_4', 'x_fr_6', 'x_fr_8',
+                        'x_kk_0', 'x_kk_2', 'x_kk_4', 'x_kk_6', 'x_kk_8',
+                        'y_fr_0', 'y_fr_2', 'y_fr_4', 'y_fr_6', 'y_fr_8',
+                        'y_kk_0', 'y_kk_2', 'y_kk_4', 'y_kk_6', 'y_kk_8'})
+
 
 class TestAnalysis(unittest.TestCase):
     url_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}/example.html'
 
     @classmethod
     def setUpClass(cls):
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
-
-    @classmethod
-    def tearDownClass(cls):
-        cls._server.stop()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
 
     def setUp(self):
         self.run_extended = False
@@ -59,26 +60,23 @@ class TestAnalysis(unittest.TestCase):
 
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
-        # Note: instantiate afresh each time we run, not just once w/static val
-        self.output_dir = DemodocusTemporaryDirectory()
-
-    def tearDown(self):
-        # Remove temp dir
-        self.output_dir.cleanup()
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
 
     def _test_analysis(self, example_str, test_func):
-        pyexe = sys.executable
         """Crawl with each controller type and a variety of thread counts.
         Verify their output is all the same, or at least graph-isomorphic.
         This code repeats itself a lot. Seemed best to be explicit at first."""
-        crawl_dir = Path(self.output_dir.name)
+        # Only the crawl needs an output directory, so the other tests don't make one.
+        #  Note: instantiate afresh each time we run, not just once w/static val
+        output_dir = DemodocusTemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        crawl_dir = Path(output_dir.name)
         url = self.format_url(example_str)
+        # Arguments for crawler.py. The crawl runs in this process, so it
+        #  doesn't pay for a new interpreter and all the imports each time.
         base_args = [
-            pyexe,
-            (Path('.') / 'crawler.py').absolute(),
             '--output_dir',
             crawl_dir,
             '--mode',
@@ -89,17 +87,19 @@ class TestAnalysis(unittest.TestCase):
         # Multi-threaded, 4 threads
         c4_path = crawl_dir / 'multi4'
         c4_args = base_args[:]
-        c4_args[3] = c4_path
-        c4_args[5] = 'demodocusfw.tests.config.mode_crawler_multi4'
+        c4_args[1] = c4_path
+        c4_args[3] = 'demodocusfw.tests.config.mode_crawler_multi4'
         c4_args = [str(a) for a in c4_args]
         print('Four threads')
-        c4_p = subprocess.run(c4_args)
-        self.assertEqual(c4_p.returncode, 0)
+        spec = importlib.util.spec_from_file_location('crawler', ROOT_DIR / 'crawler.py')
+        crawler = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(crawler)
+        self.assertEqual(crawler.main(c4_args), 0)
 
         gml_fpath = c4_path / 'full_graph.gml'
 
         # loading in analyzer used in the crawl
-        config_spec = check_config_mode(c4_args[5])
+        config_spec = check_config_mode(c4_args[3])
         config = import_config_from_spec(config_spec)
         analyzer = config.ANALYZER_CLASS(gml_fpath, config)
         analyzer._analyze_build()
@@ -112,26 +112,20 @@ class TestAnalysis(unittest.TestCase):
         user = "VizKeyUser"
         keyboard_actions_graph = analyzer._get_user_actions_subgraph(user)
         actions = {str(e) for e in VizKeyUser.actions}
-        graph_actions = {i[2]['action'] for i in
-                         keyboard_actions_graph.edges(data=True)}
-        self.assertTrue(all([a in actions for a in graph_actions]))
+        graph_actions = {action for _, _, action in
+                         keyboard_actions_graph.edges(data='action')}
+        self.assertLessEqual(graph_actions, actions)
 
         # Ensuring that the expected files are outputted
-        files_outputted = os.listdir(c4_path)
-        self.assertTrue(analyzer._analyzed_gml_fname in files_outputted)
-        self.assertTrue(analyzer._json_data_fname in files_outputted)
-        self.assertTrue(analyzer._report_fname in files_outputted)
-        self.assertTrue("network_layouts" in files_outputted)
-        self.assertTrue("VizKeyUser_paths_df.csv" in files_outputted)
-        self.assertTrue("VizMouseKeyUser_paths_df.csv" in files_outputted)
+        files_outputted = set(os.listdir(c4_path))
+        expected_files = {analyzer._analyzed_gml_fname, analyzer._json_data_fname,
+                          analyzer._report_fname, "network_layouts",
+                          "VizKeyUser_paths_df.csv", "VizMouseKeyUser_paths_df.csv"}
+        self.assertLessEqual(expected_files, files_outputted)
 
         # Make sure the x,y fields are included in the full graph
-        pos_fiels = {'x_fr_0', 'x_fr_2', 'x_fr_4', 'x_fr_6', 'x_fr_8',
-                     'x_kk_0', 'x_kk_2', 'x_kk_4', 'x_kk_6', 'x_kk_8',
-                     'y_fr_0', 'y_fr_2', 'y_fr_4', 'y_fr_6', 'y_fr_8',
-                     'y_kk_0', 'y_kk_2', 'y_kk_4', 'y_kk_6', 'y_kk_8'}
-        for _, node_dict in list(analyzer.full_graph.nodes(data=True)):
-            assert pos_fiels.issubset(set(node_dict.keys()))
+        for _, node_dict in analyzer.full_graph.nodes(data=True):
+            assert POS_FIELDS.issubset(node_dict)
 
         # Try to open the json file. If it didn't write correctly, it ALMOST
         #  certainly will not open correctly.
@@ -267,6 +261,7 @@ class TestAnalysis(unittest.TestCase):
             self.assertEqual(violation_1, expected_v2)
             self.assertEqual(violation_2, expected_v1)
 
+    @requires_chrome
     def test_analysis(self):
         if self.run_extended:
             self._test_analysis('list/partaccessible_1', self._test_extended_analysis)
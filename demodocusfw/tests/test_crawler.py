@@ -22,25 +22,30 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
 import logging
 import os
 from pathlib import Path
 import subprocess
 import sys
 from sys import stdout
+import tempfile
 import unittest
 
 import networkx as nx
 import pandas as pd
 
 from .config import mode_crawler_single as config_single
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
+from demodocusfw.analysis import BaseAnalyzer
 from demodocusfw.crawler import import_config_from_spec, check_config_mode
 from demodocusfw.utils import DemodocusTemporaryDirectory, set_up_logging, ROOT_DIR
 from demodocusfw.web.utils import serve_output_folder
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestCrawler(unittest.TestCase):
 
     ep_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}/example.html'
@@ -49,15 +54,36 @@ class TestCrawler(unittest.TestCase):
     def setUpClass(cls):
         set_up_logging(logging.INFO)
         # Set up server to serve up the examples.
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
+        cls._ep_template = cls.ep_template.format(cls.server_ip, cls.server_port, '{}')
+        # Most tests here crawl in a subprocess, so the browser for the ones that
+        #  don't is only started when a test first asks for it.
+        cls._access = None
 
     @classmethod
     def tearDownClass(cls):
-        cls._server.stop()
+        if cls._access is not None:
+            cls._access.shutdown()
+            cls._output_server.stop()
+            config_single.OUTPUT_DIR.cleanup()
+
+    def _get_access(self):
+        """Returns the browser shared by the tests that don't run a crawl, starting it if needed."""
+        cls = type(self)
+        if cls._access is None:
+            # Since there's no controller, set up server to serve up the output folder.
+            config_single.OUTPUT_DIR = DemodocusTemporaryDirectory()
+            cls._output_server = serve_output_folder(config_single)
+            cls._access = ChromeWebAccess(config_single)
+        else:
+            # Start from a clean page, without anything the last test left behind.
+            cls._access.reset()
+            cls._access._driver.get('about:blank')
+            cls._access._driver.delete_all_cookies()
+        return cls._access
 
     def setUp(self):
         self.run_extended = False
@@ -76,22 +102,35 @@ class TestCrawler(unittest.TestCase):
         self.output_dir = None
 
     def format_ep(self, path):
-        return self.ep_template.format(self.server_ip, self.server_port, path)
-
-    def _run(self, args):
-        """Runs a subprocess, prints output and waits for it to exit."""
-        # Convert everything to strings.
-        args = [str(a) for a in args]
-        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        with proc.stdout:
-            for line in iter(proc.stdout.readline, b''):
-                print(line)
-        exitcode = proc.wait(1200)
-        print("Exitcode " + str(exitcode))
-        self.assertEqual(exitcode, 0)
-
-    def _run_ep(self, ep, out_folder, mode):
-        """Runs a subprocess crawler on a single url.
+        return self._ep_template.format(path)
+
+    def _run(self, *args_list):
+        """Runs one or more subprocesses at the same time and waits for them all
+        to exit. Their output is only printed if they fail, since a crawl logs
+        thousands of lines."""
+        def _run_one(args):
+            # Convert everything to strings.
+            args = [str(a) for a in args]
+            # The output goes straight to a file, so we don't have to keep
+            #  reading it from a pipe while the crawl runs.
+            with tempfile.TemporaryFile() as output:
+                proc = subprocess.run(args, stdout=output, stderr=subprocess.STDOUT, timeout=1200)
+                if proc.returncode != 0:
+                    output.seek(0)
+                    proc.stdout = output.read().decode(errors='replace')
+            return proc
+
+        # Threads only wait on the subprocesses, which do the actual work.
+        with ThreadPoolExecutor(max_workers=len(args_list)) as executor:
+            procs = list(executor.map(_run_one, args_list))
+        for proc in procs:
+            if proc.returncode != 0:
+                print(proc.stdout)
+            print("Exitcode " + str(proc.returncode))
+            self.assertEqual(proc.returncode, 0)
+
+    def _ep_args(self, ep, out_folder, mode):
+        """Gets the arguments for a subprocess crawler on a single url.
 
         Args:
             ep: single url to crawl
@@ -99,7 +138,7 @@ class TestCrawler(unittest.TestCase):
             mode: the config mode to use, as a string
 
         Returns:
-            full output path
+            The arguments, and the full output path
         """
         pyexe = sys.executable
         path = Path(self.output_dir.name) / out_folder
@@ -112,8 +151,7 @@ class TestCrawler(unittest.TestCase):
             '--mode',
             mode,
             ep]
-        self._run(args)
-        return path
+        return args, path
 
     def _run_eps(self, eps_file, out_folder, mode):
         """Runs a subprocess crawler on a file with multiple urls.
@@ -149,41 +187,46 @@ class TestCrawler(unittest.TestCase):
                 file.write(line + '\n')
         return ep_txt_fpath
 
+    def _assert_isomorphic(self, g1, g2):
+        """Asserts that two graphs are isomorphic. The sizes and degree sequences
+        are compared first, so graphs that differ there fail right away instead
+        of in the (possibly very long) isomorphism search."""
+        self.assertEqual((g1.number_of_nodes(), g1.number_of_edges()),
+                         (g2.number_of_nodes(), g2.number_of_edges()))
+        self.assertEqual(sorted(d for _, d in g1.degree()), sorted(d for _, d in g2.degree()))
+        # VF2++ (networkx >= 2.8) orders its search far better than VF2 on graphs
+        #  with many similar states.
+        is_isomorphic = getattr(nx, 'vf2pp_is_isomorphic', nx.is_isomorphic)
+        self.assertTrue(is_isomorphic(g1, g2))
+
     def _test_equivalence(self, example_str):
         ep = self.format_ep(example_str)
         """Crawl with each controller type and a variety of thread counts.
         Verify their output is all the same, or at least graph-isomorphic.
         This code repeats itself a lot. Seemed best to be explicit at first."""
         # Single-thread, original controller
-        c1_path = self._run_ep(ep, 'single', 'demodocusfw.tests.config.mode_crawler_single_w_screenshots')
+        c1_args, c1_path = self._ep_args(ep, 'single', 'demodocusfw.tests.config.mode_crawler_single_w_screenshots')
         # Single thread, multicontroller
-        c2_path = self._run_ep(ep, 'multi1', 'demodocusfw.tests.config.mode_crawler_multi1_w_screenshots')
+        c2_args, c2_path = self._ep_args(ep, 'multi1', 'demodocusfw.tests.config.mode_crawler_multi1_w_screenshots')
         # Multi-threaded, 4 threads
-        c4_path = self._run_ep(ep, 'multi4', 'demodocusfw.tests.config.mode_crawler_multi4_w_screenshots')
-
-        c1_gml = c1_path / 'full_graph.gml'
-        c1_nxg = nx.read_gml(c1_gml)
-
-        c2_gml = c2_path / 'full_graph.gml'
-        c2_nxg = nx.read_gml(c2_gml)
+        c4_args, c4_path = self._ep_args(ep, 'multi4', 'demodocusfw.tests.config.mode_crawler_multi4_w_screenshots')
+        # The crawls don't depend on each other, so run them all at once.
+        self._run(c1_args, c2_args, c4_args)
 
-        c4_gml = c4_path / 'full_graph.gml'
-        c4_nxg = nx.read_gml(c4_gml)
+        # Each graph is read once and used for both the isomorphism and the click checks.
+        c1_nxg = BaseAnalyzer._read_gml(c1_path / 'full_graph.gml')
+        c2_nxg = BaseAnalyzer._read_gml(c2_path / 'full_graph.gml')
+        c4_nxg = BaseAnalyzer._read_gml(c4_path / 'full_graph.gml')
 
         # test isomorphisms
-        self.assertTrue(nx.is_isomorphic(c1_nxg, c2_nxg))
-        self.assertTrue(nx.is_isomorphic(c1_nxg, c4_nxg))
+        self._assert_isomorphic(c1_nxg, c2_nxg)
+        self._assert_isomorphic(c1_nxg, c4_nxg)
 
         # test that click events are fuzzy values for VizMouseKeyUser
-        c1norm_clicks = [i[2]["VizMouseKeyUser"] for i in c1_nxg.edges(data=True)
-                         if i[2]["action"] == "click"]
-        c2norm_clicks = [i[2]["VizMouseKeyUser"] for i in c2_nxg.edges(data=True)
-                         if i[2]["action"] == "click"]
-        c4norm_clicks = [i[2]["VizMouseKeyUser"] for i in c4_nxg.edges(data=True)
-                         if i[2]["action"] == "click"]
-        self.assertTrue(min(c1norm_clicks) >= 0 and max(c1norm_clicks) <= 1)
-        self.assertTrue(min(c2norm_clicks) >= 0 and max(c2norm_clicks) <= 1)
-        self.assertTrue(min(c4norm_clicks) >= 0 and max(c4norm_clicks) <= 1)
+        for nxg in (c1_nxg, c2_nxg, c4_nxg):
+            click_scores = [data["VizMouseKeyUser"] for _, _, data in nxg.edges(data=True)
+                            if data["action"] == "click"]
+            self.assertTrue(min(click_scores) >= 0 and max(click_scores) <= 1)
 
         # Ensure other files are outputted as expect
         self._test_output_dir(c1_path)
@@ -196,22 +239,20 @@ class TestCrawler(unittest.TestCase):
     """
 
     def _run_compile_outputs(self, path, output_csv_fpath):
-        """Runs a subprocess call to util_scripts/compile_outputs.py .
+        """Runs util_scripts/compile_outputs.py, in this process rather than a
+        new interpreter.
 
         Args:
             path: path of crawl output dirs to run compile_outputs.py for.
             output_csv_fpath: filepath to write csv to
         """
-        pyexe = sys.executable
-        # Single-thread, original controller
-        args = [
-            pyexe,
-            ROOT_DIR / 'util_scripts' / 'compile_outputs.py',
-            Path(path).absolute(),
-            "-o",
-            Path(output_csv_fpath).absolute()
-            ]
-        self._run(args)
+        spec = importlib.util.spec_from_file_location(
+            'compile_outputs', ROOT_DIR / 'util_scripts' / 'compile_outputs.py')
+        compile_outputs = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(compile_outputs)
+
+        args = [Path(path).absolute(), "-o", Path(output_csv_fpath).absolute()]
+        self.assertEqual(compile_outputs.main([str(a) for a in args]), 0)
 
     def _test_output_dir_helper(self, single_output_path):
         # Check that state files are written
@@ -298,8 +339,7 @@ class TestCrawler(unittest.TestCase):
         c1_args[3] = c1_path
         # Convert everything to strings.
         c1_args = [str(a) for a in c1_args]
-        c1_p = subprocess.run(c1_args)
-        self.assertEqual(c1_p.returncode, 0)
+        self._run(c1_args)
 
         gml_fpath = c1_path / 'full_graph.gml'
 
@@ -361,15 +401,11 @@ class TestCrawler(unittest.TestCase):
             self._run_perceive('perceivability_example', self._test_extended_perceive)
 
     def test_demodocus_nojs(self):
-        config_single.OUTPUT_DIR = self.output_dir
-
         """ Try loading an "additive" javascript page and make sure elements are not duplicated."""
-        # Since there's no controller, set up server to serve up the output folder.
-        output_server = serve_output_folder(config_single)
+        access = self._get_access()
 
         path = 'http://{}:{}/demodocusfw/tests/sandbox/misc/additive_javascript/additive3.html'.format(
             self.server_ip, self.server_port)
-        access = ChromeWebAccess(config_single)
         self.assertTrue(access.load(path))
         # There should be only two inputs on the page.
         target_els = access.query_xpath("//input")
@@ -382,20 +418,12 @@ class TestCrawler(unittest.TestCase):
         target_els = access.query_xpath("//script[@src]")
         self.assertEqual(len(target_els), 1)
 
-        access.shutdown()
-        output_server.stop()
-
     def test_page_cookies(self):
         """ Test to determine if we can handle pages that try to set cookies """
-        # Since there's no controller, set up server to serve up the output folder.
-        config_single.OUTPUT_DIR = self.output_dir
-        output_server = serve_output_folder(config_single)
-        access = ChromeWebAccess(config_single)
+        access = self._get_access()
         # Not setting testing mode to true
         access.load(self.format_ep('cookies'))
         self.assertTrue('success' in access._driver.title)
-        access.shutdown()
-        output_server.stop()
 
 
 if __name__ == '__main__':
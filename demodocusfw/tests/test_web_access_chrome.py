@@ -30,10 +30,11 @@ import unittest
 from .config import mode_test as config
 from demodocusfw.controller import Controller
 from demodocusfw.utils import DemodocusTemporaryDirectory, set_up_logging
-from demodocusfw.web.server import ThreadedHTTPServer
+from .utils import get_sandbox_server, requires_chrome
 from demodocusfw.web.web_access import ChromeWebAccess
 
 
+@requires_chrome
 class TestWebAccessChrome(unittest.TestCase):
 
     url_template = 'http://{}:{}/demodocusfw/tests/sandbox/{}/example.html'
@@ -42,22 +43,18 @@ class TestWebAccessChrome(unittest.TestCase):
     def setUpClass(cls):
         set_up_logging(logging.INFO)
         # Set up server to serve up the examples.
-        cls._server = ThreadedHTTPServer('localhost', 0)
+        cls._server = get_sandbox_server()
         cls.server_ip, cls.server_port = cls._server.server.server_address
         print('server_ip: {}'.format(cls.server_ip))
         print('server_port: {}'.format(cls.server_port))
-        cls._server.start()
-
-    @classmethod
-    def tearDownClass(cls):
-        cls._server.stop()
+        cls._url_template = cls.url_template.format(cls.server_ip, cls.server_port, '{}')
 
     def setUp(self):
         stdout.write('{}\n'.format(self._testMethodName))
         stdout.flush()
 
     def format_url(self, path):
-        return self.url_template.format(self.server_ip, self.server_port, path)
+        return self._url_template.format(path)
 
     def test_chrome_output_data_dir(self):
         # Test output dir is created and destroyed as expected
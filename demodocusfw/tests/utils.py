@@ -0,0 +1,53 @@
+"""
+Software License Agreement (Apache 2.0)
+
+Copyright (c) 2020, The MITRE Corporation.
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This project was developed by The MITRE Corporation.
+If this code is used in a deployment or embedded within another project,
+it is requested that you send an email to opensource@mitre.org in order to
+let us know where this software is being used.
+"""
+
+import atexit
+import os
+import unittest
+
+from demodocusfw.web.server import ThreadedHTTPServer
+
+# Decorator for test classes and methods that drive Chrome. Set DEM_NO_CHROME=True
+#  to skip them, along with their (slow) Chrome start up in setUpClass.
+requires_chrome = unittest.skipIf(os.environ.get('DEM_NO_CHROME') == 'True',
+                                  'DEM_NO_CHROME=True skips the tests that need Chrome')
+
+_sandbox_server = None
+
+
+def get_sandbox_server():
+    """Returns the web server shared by all test classes, starting it on first use.
+
+    Every test class serves the sandbox from the repository root, so one server
+    can be used for the whole test run. It is stopped when the process exits.
+
+    Returns:
+        The running ThreadedHTTPServer.
+    """
+    global _sandbox_server
+    if _sandbox_server is None:
+        _sandbox_server = ThreadedHTTPServer('localhost', 0)
+        _sandbox_server.start()
+        atexit.register(_sandbox_server.stop)
+    return _sandbox_server
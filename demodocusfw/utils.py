@@ -22,6 +22,7 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+from functools import lru_cache
 import logging
 import os
 from pathlib import Path
@@ -124,6 +125,26 @@ class DemodocusTemporaryDirectory:
             pass
 
 
+def _calculate_luminance(color_code):
+    """Helper function to calculate luminance for one channel of rgb"""
+    index = float(color_code) / 255
+
+    if index < 0.03928:
+        return index / 12.92
+    else:
+        return ((index + 0.055) / 1.055) ** 2.4
+
+
+# A page only uses a handful of colors, but the analysis compares them for every
+#  element in every state, so remember the luminance of each color.
+@lru_cache(maxsize=1024)
+def _calculate_relative_luminance(red, green, blue):
+    """Helper function to calculate luminance for all channels of rgb"""
+    return 0.2126 * _calculate_luminance(red) + \
+           0.7152 * _calculate_luminance(green) + \
+           0.0722 * _calculate_luminance(blue)
+
+
 def color_contrast_ratio(fore_color, back_color):
     """Calculated the contrast ratio between a foreground color (with optional
     alpha) and a background color.
@@ -136,21 +157,6 @@ def color_contrast_ratio(fore_color, back_color):
         Contrast ratio between the two colors
     """
 
-    def _calculate_luminance(color_code):
-        """Helper function to calculate luminance for one channel of rgb"""
-        index = float(color_code) / 255
-
-        if index < 0.03928:
-            return index / 12.92
-        else:
-            return ((index + 0.055) / 1.055) ** 2.4
-
-    def _calculate_relative_luminance(rgb):
-        """Helper function to calculate luminance for all channels of rgb"""
-        return 0.2126 * _calculate_luminance(rgb[0]) + \
-               0.7152 * _calculate_luminance(rgb[1]) + \
-               0.0722 * _calculate_luminance(rgb[2])
-
     # find which color is lighter/darker
     light = back_color if sum(back_color[0:3]) >= sum(
         fore_color[0:3]) else fore_color
@@ -158,8 +164,8 @@ def color_contrast_ratio(fore_color, back_color):
         fore_color[0:3]) else fore_color
 
     # compute contrast ratio
-    contrast_ratio = (_calculate_relative_luminance(light) + 0.05) / \
-                     (_calculate_relative_luminance(dark) + 0.05)
+    contrast_ratio = (_calculate_relative_luminance(*light[0:3]) + 0.05) / \
+                     (_calculate_relative_luminance(*dark[0:3]) + 0.05)
 
     # Scale by the transparency of the el
     # contrast_ratio - 1 brings the color contrast range to [0, 20] so
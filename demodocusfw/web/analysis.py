@@ -44,6 +44,13 @@ from demodocusfw.web.action import keyboard_actions, mouse_actions
 
 logger = logging.getLogger('analysis.webaccessanalyzer')
 
+# Matches strings of the type rgb(ddd, dd, d), and accounts for their
+# being 1-3 numbers, and also wierd whitespace potentially
+RE_RGB = re.compile(r"rgb\(\s*([0-9]+),\s*([0-9]+),\s*([0-9]+)\)")
+# Matches strings of the form rgba(ddd, d, d, d) or rgba(ddd, d, d, 0.d*)
+# Accounts for alpha being 1 or some random decimal
+RE_RGBA = re.compile(r"rgba\(\s*([0-9]+),\s*([0-9]+),\s*([0-9]+),\s*([0-9]+\.*[0-9]*)\)")
+
 
 """Customized version of BaseAnalyzer that also analyzes a graph for
 accessibility violations and possible outcomes if inaccessible elements are made
@@ -669,22 +676,13 @@ class WebAccessAnalyzer(BaseAnalyzer):
             List of the style numbers. Note it will have len 3 for rgb and len 4 for rgba
         """
 
-
-        # Matches strings of the type rgb(ddd, dd, d), and accounts for their
-        # being 1-3 numbers, and also wierd whitespace potentially
-        rgb_regex = "rgb\(\s*[0-9]+,\s*[0-9]+,\s*[0-9]+\)"
-        # Matches strings of the form rgba(ddd, d, d, d) or rgba(ddd, d, d, 0.d*)
-        # Accounts for alpha being 1 or some random decimal
-        rgba_regex = "rgba\(\s*[0-9]+,\s*[0-9]+,\s*[0-9]+,\s*[0-9]+\.*[0-9]*\)"
-
         if color_str.find("rgb(") > -1:
-            r = re.search(rgb_regex, color_str)
-            return [int(c) for c in r.group(0)[4:-1].split(",")]
+            r = RE_RGB.search(color_str)
+            return [int(c) for c in r.groups()]
         elif color_str.find("rgba(") > -1:
-            r = re.search(rgba_regex, color_str)
-            split = r.group(0)[5:-1].split(",")
-            rgb = [int(c) for c in split[0:3]]
-            return rgb + [float(split[3])] # Alpha value likely to be decimal
+            r = RE_RGBA.search(color_str)
+            red, green, blue, alpha = r.groups()
+            return [int(red), int(green), int(blue), float(alpha)]  # Alpha value likely to be decimal
 
         return None
 
@@ -955,6 +953,9 @@ class WebAccessAnalyzer(BaseAnalyzer):
         # Iterate through the full graph and send each node through to each
         #  helper sc method to get all atomic violations
         all_violations = defaultdict(lambda: defaultdict(list))
+        # The violations already added to each state, as hashable tuples, since
+        #  violations are (nested) dicts and can't go in a set themselves.
+        seen_violations = defaultdict(set)
         for state_id in self.full_graph.nodes():
             # Initialize the dict for this state
             state_screenshot_path = str(screenshot_path / f"state-{state_id}.png")
@@ -969,7 +970,14 @@ class WebAccessAnalyzer(BaseAnalyzer):
             #  tracked them (necessary when there are multiple actions from
             #  state_id to another state, typically when all violate a rule)
             for (source_id, violation) in source_violations:
-                if violation not in all_violations[source_id]["violations"]:
+                try:
+                    violation_key = self._violation_key(violation)
+                    is_new = violation_key not in seen_violations[source_id]
+                    seen_violations[source_id].add(violation_key)
+                except TypeError:
+                    # Some value can't be hashed or sorted, so fall back to the list
+                    is_new = violation not in all_violations[source_id]["violations"]
+                if is_new:
                     all_violations[source_id]["violations"].append(violation)
 
         # Form composite violations
@@ -1269,6 +1277,24 @@ class WebAccessAnalyzer(BaseAnalyzer):
 
         return source_violations
 
+    @staticmethod
+    def _violation_key(value):
+        """Converts a violation (or one of its values) into nested tuples, so
+        equal violations give equal, hashable keys.
+
+        Args:
+            value: violation dict, or any value inside one
+
+        Returns:
+            key: value with its dicts and lists turned into tuples
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((k, WebAccessAnalyzer._violation_key(v))
+                                for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(WebAccessAnalyzer._violation_key(v) for v in value)
+        return value
+
     def _format_violation(self, type, level, category, element, replay=None,
                           code=None, num_issues=None, state_link=None):
         """Helper function to format a violation dictionary.
@@ -1300,10 +1326,11 @@ class WebAccessAnalyzer(BaseAnalyzer):
                      "element": element, "group_id": self._group_id}
 
         # Save the other fields only if they are not None
-        fields = {"replay", "code", "num_issues", "state_link"}
-        for field in fields:
-            if eval(field) is not None:
-                violation[field] = eval(field)
+        fields = {"replay": replay, "code": code, "num_issues": num_issues,
+                  "state_link": state_link}
+        for field, value in fields.items():
+            if value is not None:
+                violation[field] = value
 
         return violation
 
@@ -22,6 +22,7 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+from functools import lru_cache
 from io import StringIO
 import logging
 
@@ -34,6 +35,17 @@ from .dom_manipulations import REACHABLE_ATT_NAME
 logger = logging.getLogger('web.compare')
 
 
+# Whole page trees can be large, so only keep enough for the stages of one
+#  pipeline to share: two doms for each of a few comparators.
+@lru_cache(maxsize=8)
+def _parse_html(dom):
+    """Parses a dom string into an lxml tree. Cached because every comparator
+    in a pipeline parses the same pair of doms. The trees are only read.
+    Whitespace-only text is dropped while parsing; the stylesheets strip it
+    anyway (xsl:strip-space), so this just keeps the trees smaller."""
+    return etree.parse(StringIO(dom), parser=etree.HTMLParser(remove_blank_text=True))
+
+
 class XSLTComparator(BaseComparator):
 
     xslt_text = """
@@ -46,25 +58,32 @@ class XSLTComparator(BaseComparator):
     def __init__(self, xslt_text=xslt_text):
         self.xslt_text = xslt_text
         self.tr = None
+        # Transformed doms, per comparator since each has its own xslt. Only a
+        #  few are kept, since comparators live for the whole process: enough for
+        #  the new dom being compared and the last few it was compared against.
+        self.transform = lru_cache(maxsize=8)(self._transform)
 
     # re_sub = re.compile(r'[;\s]+')
 
-    def match(self, dom1, dom2):
+    def _transform(self, dom):
+        """Returns the xslt output for a dom string, see self.transform()."""
         if self.tr is None:
             xslt = etree.XML(self.xslt_text)
             self.tr = etree.XSLT(xslt)
+        return str(self.tr(_parse_html(dom)))
 
-        dom1 = etree.parse(StringIO(dom1), parser=etree.HTMLParser())
-        dom2 = etree.parse(StringIO(dom2), parser=etree.HTMLParser())
-        # dom1 = etree.XML(dom1)
-        # dom2 = etree.XML(dom2)
-        strdom1 = str(self.tr(dom1))
-        strdom2 = str(self.tr(dom2))
+    def match(self, dom1, dom2):
+        # Identical doms transform identically.
+        if dom1 == dom2:
+            return True
+
+        strdom1 = self.transform(dom1)
+        strdom2 = self.transform(dom2)
 
         match_result = strdom1 == strdom2
 
-        logger.debug("Running a {} with:\ndom1 = [\n\t{}\n\t   ]\ndom2 = [\n\t{}\n\t   ]\nreturned = {}\n".format(\
-            self.__class__.__name__, strdom1, strdom2, match_result))
+        logger.debug("Running a %s with:\ndom1 = [\n\t%s\n\t   ]\ndom2 = [\n\t%s\n\t   ]\nreturned = %s\n",
+                     self.__class__.__name__, strdom1, strdom2, match_result)
 
         return match_result
         # return self.re_sub.sub('', str(self.tr(dom1))) == self.re_sub.sub('', str(self.tr(dom2)))
@@ -168,47 +187,45 @@ class FlexibleTextComparator(XSLTComparator):
         assert 0 <= min_threshold <= 1, 'min_threshold must be >= 0 and <= 1'
         self._min_threshold = min_threshold
 
-    def match(self, dom1, dom2):
-
-        if self.tr is None:
-            xslt = etree.XML(self.xslt_text)
-            self.tr = etree.XSLT(xslt)
-
-        dom1 = etree.parse(StringIO(dom1), parser=etree.HTMLParser())
-        dom2 = etree.parse(StringIO(dom2), parser=etree.HTMLParser())
-        # dom1 = etree.XML(dom1)
-        # dom2 = etree.XML(dom2)
-        #strdom1 = str(self.tr(dom1))
-        #strdom2 = str(self.tr(dom2))
+    def _transform(self, dom):
+        """Returns the text of a dom with all whitespace removed. Done here
+        rather than in match() so the stripped text is cached too."""
+        strdom = ''.join(super()._transform(dom).split())
+        if strdom[0:20] == '<?xmlversion="1.0"?>':
+            strdom = strdom[20:]
+        return strdom
 
-        strdom1 = ''.join(str(self.tr(dom1)).split())
-        strdom2 = ''.join(str(self.tr(dom2)).split())
-
-        if strdom1[0:20] == '<?xmlversion="1.0"?>':
-            strdom1 = strdom1[20:]
-
-        if strdom2[0:20] == '<?xmlversion="1.0"?>':
-            strdom2 = strdom2[20:]
+    def match(self, dom1, dom2):
 
-        dist = self.dist_func(strdom1, strdom2)
+        strdom1 = self.transform(dom1)
+        strdom2 = self.transform(dom2)
 
         # distance functions that output number of differencs/operations
         if self.dist_func in self.dist_funcs[0:3]:
-            dist_ratio = 1 - (dist / max(len(strdom1), len(strdom2)))
-            result_match = dist <= self.max_operations and \
-                dist_ratio >= self.min_threshold
+            if strdom1 == strdom2:
+                dist = 0
+                result_match = True
+            else:
+                # These distances are never less than the difference in length,
+                #  so skip computing them when that alone rules out a match.
+                max_len = max(len(strdom1), len(strdom2))
+                len_diff = abs(len(strdom1) - len(strdom2))
+                if len_diff > self.max_operations or 1 - (len_diff / max_len) < self.min_threshold:
+                    dist = f'>= {len_diff}'
+                    result_match = False
+                else:
+                    dist = self.dist_func(strdom1, strdom2)
+                    dist_ratio = 1 - (dist / max_len)
+                    result_match = dist <= self.max_operations and \
+                        dist_ratio >= self.min_threshold
         # distance functions that output a similarity score
         else:
+            dist = self.dist_func(strdom1, strdom2)
             result_match = dist >= self.min_threshold
 
-        logger.debug("Running a {} with:\n".format(self.__class__.__name__) + \
-                    "dom1 = [\n\t{}\n\t   ]\n".format(strdom1) + \
-                    "dom2 = [\n\t{}\n\t   ]\n".format(strdom2) + \
-                    "function = {}\n".format(self.dist_func.__name__) + \
-                    "max_operations = {}\n".format(self.max_operations) + \
-                    "min_threshold = {}\n".format(self.min_threshold) + \
-                    "dist = {}\n".format(str(dist)) + \
-                    "returned = {}\n".format(str(result_match))
-                    )
+        logger.debug("Running a %s with:\ndom1 = [\n\t%s\n\t   ]\ndom2 = [\n\t%s\n\t   ]\n"
+                     "function = %s\nmax_operations = %s\nmin_threshold = %s\ndist = %s\nreturned = %s\n",
+                     self.__class__.__name__, strdom1, strdom2, self.dist_func.__name__,
+                     self.max_operations, self.min_threshold, dist, result_match)
 
         return result_match
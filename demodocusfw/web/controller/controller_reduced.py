@@ -52,7 +52,7 @@ class ControllerReduced(Controller):
             graph.Graph representing the built graph for a given UserModel
         """
 
-        graph = Graph()
+        graph = Graph(use_lock=False)
         self.graph = graph
 
         # Create an initial state and add it to the graph.
@@ -29,9 +29,10 @@ REACHABLE_ATT_NAME = "demod_reachable"
 
 # Various regexes for identifying things in the dom.
 RE_COMMENTS = re.compile(r"\<\!\-\-.*?\-\-\>")
-RE_HTML = re.compile(r"\<html(\s.*?)?\>", flags=re.DOTALL | re.MULTILINE)
-RE_HEAD = re.compile(r"\<head(\s.*?)?\>", flags=re.DOTALL | re.MULTILINE)
-RE_BODY = re.compile(r"\<body(\s.*?)?\>", flags=re.DOTALL | re.MULTILINE)
+# [^>]* matches the same as a lazy .*? up to the first >, without backtracking at every character.
+RE_HTML = re.compile(r"\<html(\s[^>]*)?\>", flags=re.DOTALL | re.MULTILINE)
+RE_HEAD = re.compile(r"\<head(\s[^>]*)?\>", flags=re.DOTALL | re.MULTILINE)
+RE_BODY = re.compile(r"\<body(\s[^>]*)?\>", flags=re.DOTALL | re.MULTILINE)
 RE_BODY_CLOSE = re.compile(r"\</body\>")
 RE_HTML_CLOSE = re.compile(r"\</html\>")
 RE_BLANK_LINE = re.compile(r"(\r*\n\r*){2,}")
@@ -98,11 +99,17 @@ js_end = r"""</script>"""
 
 # Get all of the javascript from other files
 
+get_xpath_filename = "./demodocusfw/web/js/get_xpath.js"
+with open(get_xpath_filename) as f:
+    js_get_xpath = f.read()
+
 # This one is a bit hacky since we need to set a global variable for the function,
-# we just prepend it to the string
+# we just prepend it to the string. It also returns the xpath of each element, so
+# it needs getXpath().
 calculate_reachable_filename = "./demodocusfw/web/js/calculate_reachable.js"
 with open(calculate_reachable_filename) as f:
-    js_calculate_reachable = f"""var REACHABLE_ATT_NAME = "{REACHABLE_ATT_NAME}";""" + f.read()
+    js_calculate_reachable = (f"""var REACHABLE_ATT_NAME = "{REACHABLE_ATT_NAME}";""" + js_get_xpath
+                              + f.read())
 
 freeze_element_data_filename = "./demodocusfw/web/js/freeze_element_data.js"
 with open(freeze_element_data_filename) as f:
@@ -112,10 +119,6 @@ track_event_listeners_filename = "./demodocusfw/web/js/track_event_listeners.js"
 with open(track_event_listeners_filename) as f:
     js_track_event_listeners = f.read()
 
-get_xpath_filename = "./demodocusfw/web/js/get_xpath.js"
-with open(get_xpath_filename) as f:
-    js_get_xpath = f.read()
-
 check_attributes_filename = "./demodocusfw/web/js/check_attributes.js"
 with open(check_attributes_filename) as f:
     js_check_attributes = f.read()
@@ -132,6 +135,17 @@ focus_first_tabbable_filename = "./demodocusfw/web/js/focus_first_tabbable.js"
 with open(focus_first_tabbable_filename) as f:
     js_focus_first_tabbable = f.read()
 
+# get_computed_outline.js ends in a return of its own, so wrap it up as the
+# getComputedOutline() function that get_tab_stop.js needs.
+get_tab_stop_filename = "./demodocusfw/web/js/get_tab_stop.js"
+with open(get_tab_stop_filename) as f:
+    js_get_tab_stop = (js_get_xpath + "\nfunction getComputedOutline() {\n" + js_get_computed_outline
+                       + "\n}\n" + f.read())
+
+# The script blocks manage_event_listeners() injects into every page.
+js_event_listeners_block = js_start + js_get_xpath + js_track_event_listeners + js_end
+js_checks_block = js_start + js_check_attributes + js_check_css + js_end
+
 
 def manage_event_listeners(source):
     """ Injects JavaScript for tracking event listeners into the page source.
@@ -142,15 +156,15 @@ def manage_event_listeners(source):
 
 
     source = insert_after(
-        source, RE_HEAD, js_start + js_get_xpath + js_track_event_listeners + js_end
+        source, RE_HEAD, js_event_listeners_block
     ) or insert_after(
-        source, RE_BODY, js_start + js_get_xpath + js_track_event_listeners + js_end
+        source, RE_BODY, js_event_listeners_block
     )
 
     source = insert_before(
-        source, RE_HTML_CLOSE, js_start + js_check_attributes + js_check_css + js_end
+        source, RE_HTML_CLOSE, js_checks_block
     ) or insert_before(
-        source, RE_BODY_CLOSE, js_start + js_check_attributes + js_check_css + js_end
+        source, RE_BODY_CLOSE, js_checks_block
     )
 
     # Remove extra newlines before returning.
@@ -142,4 +142,6 @@ function calculateReachable() {
 }
 els = calculateReachable();
 //console.log(els);
-return Array.from(els);  // Have to convert to an array to pass back to Selenium.
\ No newline at end of file
+// Have to convert to an array to pass back to Selenium. Send each element's xpath
+//  along with it, so Python doesn't have to ask for them one at a time.
+return Array.from(els, function(el) { return [el, getXpath(el)]; });
\ No newline at end of file
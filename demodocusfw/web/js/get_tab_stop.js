@@ -0,0 +1,43 @@
+/*
+Software License Agreement (Apache 2.0)
+
+Copyright (c) 2020, The MITRE Corporation.
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This project was developed by The MITRE Corporation.
+If this code is used in a deployment or embedded within another project,
+it is requested that you send an email to opensource@mitre.org in order to
+let us know where this software is being used.
+*/
+
+
+// Gets everything generate_tab_order() records about one tab stop in a single call.
+// Needs getXpath() and getComputedOutline() to be defined first.
+// arguments[0]: the element to describe, or null for the element that has focus
+// arguments[1]: the element focus just left, or null
+function get_tab_stop(el, prevEl) {
+  el = el || document.activeElement || document.body;
+  let rect = el.getBoundingClientRect();
+  let dict = {};
+  dict["el"] = el;
+  dict["xpath"] = getXpath(el);
+  // Relative to the document, like Selenium's element location.
+  dict["x"] = rect.left + window.pageXOffset;
+  dict["y"] = rect.top + window.pageYOffset;
+  dict["style"] = getComputedOutline(el);
+  dict["prev_style"] = prevEl ? getComputedOutline(prevEl) : null;
+  return dict;
+}
+return get_tab_stop(arguments[0], arguments[1]);
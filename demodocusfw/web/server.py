@@ -32,16 +32,29 @@ from demodocusfw.utils import ROOT_DIR
 
 PORT = None
 
+
+class KeepAliveHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files over HTTP/1.1, so the browser can reuse its connections
+    instead of opening a new one for every page and resource."""
+    protocol_version = 'HTTP/1.1'
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    # Kept-alive connections each hold a thread, so requests have to be handled
+    #  in threads of their own; browsers also open several connections at once.
+    request_queue_size = 64
+
+
 class ThreadedHTTPServer(object):
     def __init__(self, host, port, path=None,
-                 request_handler=http.server.SimpleHTTPRequestHandler):
+                 request_handler=KeepAliveHTTPRequestHandler):
         if path is None:
             path = ROOT_DIR
         self.path = path
         # Requires >= python 3.7
         request_handler = functools.partial(request_handler, directory=str(path))
         request_handler.directory = str(path)
-        self.server = http.server.HTTPServer((host, port), request_handler)
+        self.server = _HTTPServer((host, port), request_handler)
         self.server_thread = threading.Thread(target=self.server.serve_forever)
         self.server_thread.daemon = True
 
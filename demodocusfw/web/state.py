@@ -22,9 +22,11 @@ it is requested that you send an email to opensource@mitre.org in order to
 let us know where this software is being used.
 """
 
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
 from time import perf_counter
+from urllib.parse import urlparse
 
 from lxml import etree
 
@@ -34,6 +36,9 @@ from demodocusfw.web.template import HtmlTemplate
 
 times = list()
 
+# The same few xpaths get looked up in every state, so compile each one only once.
+_compile_xpath = lru_cache(maxsize=256)(etree.XPath)
+
 
 class WebStateData(StateData):
     """ In a web interface, a state is a particular dom.
@@ -45,6 +50,9 @@ class WebStateData(StateData):
         What about server-side information if we have access to the server?
     """
 
+    __slots__ = ('url', 'dom', 'load_time', '_lxml_tree', 'template', 'tab_dict',
+                 'tab_els_by_index', 'orig_focused_xpath', 'elements_to_explore')
+
     state_ext = "html"
 
     def __init__(self, url, dom_string):
@@ -113,24 +121,32 @@ class WebStateData(StateData):
         times.append(perf_counter() - t1)
         return result
 
+    def __hash__(self):
+        return hash(self.get_index_key())
+
     def save(self, state_id, state_output_dir):
         super().save(state_id, state_output_dir)
 
         # Save the template if present.
         if self.template is not None:
             template_fname = Path(state_output_dir) / f'state-template-{state_id}.{self.state_ext}'
-            with open(template_fname, 'w', encoding='utf-8') as fp:
-                fp.write(str(self.template))
+            template_fname.write_bytes(str(self.template).encode('utf-8'))
 
     def get_short_representation(self):
         """Returns a short string representation of the state."""
         return self.url + ': ' + self.dom[:20]  # Just print out the first few characters of the dom
 
-    def get_full_representation(self):
+    def _compute_full_representation(self):
         """Return a full representation of the state that can be used for
         distinguishing one state from another. """
         return self.dom
 
+    def get_index_key(self):
+        """States with different stub status or url paths are never equal
+        (see __eq__), so use those to narrow down which states to compare."""
+        url = urlparse(self.url)
+        return (self.stub, url.netloc, url.path)
+
     def get_output_representation(self):
         """Returns representation of the state to save to a file.
 
@@ -163,7 +179,7 @@ class WebStateData(StateData):
 
     def get_elements_by_xpath(self, xpath, find_one=True):
         """Returns lxml from an xpath."""
-        result = self._get_tree().xpath(xpath)
+        result = _compile_xpath(xpath)(self._get_tree())
         if find_one:
             return result[0] if len(result) > 0 else None
         else:
@@ -58,6 +58,7 @@ from .dom_manipulations import (
     js_start,
     js_get_computed_outline,
     js_focus_first_tabbable,
+    js_get_tab_stop,
     manage_event_listeners,
     strip_demodocus_ignore,
     RE_HTML,
@@ -806,17 +807,7 @@ class WebAccess(Access):
         Returns:
             The result of the javascript.
         """
-        # If any of the args are Elements, convert them to Selenium WebElements.
-        def _convert_args_to_elements(args):
-            args = list(args)
-            for i in range(0, len(args)):
-                if type(args[i]) == self.Element:
-                    args[i] = self.get_selenium_element(args[i])
-                elif type(args[i]) in (list, set, tuple):
-                    args[i] = _convert_args_to_elements(args[i])
-            return args
-
-        args = _convert_args_to_elements(args)
+        args = self._convert_args_to_elements(args)
         try:
             return self._driver.execute_script(js, *args)
         except Exception as e:
@@ -825,6 +816,47 @@ class WebAccess(Access):
                 .format(str(e), self._driver.current_url, js))
             return None
 
+    def run_js_after_paint(self, js, *args):
+        """ Like run_js, but waits for the browser to render the next frame before running
+        the javascript, so the layout reflects any changes made to the page so far.
+
+        Args:
+            js: javascript to run, as a string
+            *args: any number of arguments, which can be accessed in the javascript as 'arguments[0]'
+
+        Returns:
+            The result of the javascript.
+        """
+        # The last argument of an async script is the callback that hands back its result.
+        #  The second requestAnimationFrame runs after the first frame has been painted.
+        async_js = ("var done = arguments[arguments.length - 1];\n"
+                    "var args = Array.prototype.slice.call(arguments, 0, -1);\n"
+                    "requestAnimationFrame(function() { requestAnimationFrame(function() {\n"
+                    "try { done((function() {\n" + js + "\n}).apply(null, args)); }\n"
+                    "catch (e) { done({'demod_error': e.toString()}); }\n"
+                    "}); });")
+        args = self._convert_args_to_elements(args)
+        try:
+            result = self._driver.execute_async_script(async_js, *args)
+        except Exception as e:
+            result = {'demod_error': str(e)}
+        if isinstance(result, dict) and 'demod_error' in result:
+            logger.error(
+                "Error executing javascript on url: {}\n{}\nJavascript follows\n{}"
+                .format(result['demod_error'], self._driver.current_url, js))
+            return None
+        return result
+
+    def _convert_args_to_elements(self, args):
+        """If any of the args are Elements, convert them to Selenium WebElements."""
+        args = list(args)
+        for i in range(0, len(args)):
+            if type(args[i]) == self.Element:
+                args[i] = self.get_selenium_element(args[i])
+            elif type(args[i]) in (list, set, tuple):
+                args[i] = self._convert_args_to_elements(args[i])
+        return args
+
     def _freeze_element_data(self):
         """Right after doing something that could have changed page content,
         we'll inject some JavaScript to process the new content.
@@ -842,9 +874,14 @@ class WebAccess(Access):
             The set of elements that just became reachable.
         """
         # Each element should be augmented with attributes encoding any important style traits.
-        # Returns any elements that just became reachable.
-        new_reachable_elements = self.run_js(js_calculate_reachable)
-        new_reachable_elements = {self._get_element(selenium_element=el) for el in new_reachable_elements}
+        # Returns any elements that just became reachable, as [element, xpath] pairs.
+        # Reachability depends on the layout, so wait for the changes to be painted.
+        new_reachable_elements = self.run_js_after_paint(js_calculate_reachable)
+        if new_reachable_elements is None:
+            # The browser may not paint at all (e.g., a hidden window), so don't wait on it.
+            new_reachable_elements = self.run_js(js_calculate_reachable)
+        new_reachable_elements = {self._get_element(xpath=xpath, selenium_element=el)
+                                  for el, xpath in new_reachable_elements}
         return new_reachable_elements
 
     def reset_state(self):
@@ -892,17 +929,18 @@ class WebAccess(Access):
         self._elements[xpath] = element
         return element
 
-    def get_elements_supporting_js_event(self, js_event_type):
+    def get_elements_supporting_js_event(self, js_event_type, find_one=False):
         """ Retrieves all elements that are registered for this js event.
 
         Args:
             js_event_type: A javascript event type like click or keyup.
+            find_one: will return only the first such element (or None) if true
 
         Returns:
             The set of elements that have registered an event handler for this event type.
         """
         query = f'//*[@demod_{js_event_type}][@{REACHABLE_ATT_NAME}="true"]'
-        els = self.query_xpath(query)
+        els = self.query_xpath(query, find_one=find_one)
         return els
 
     def query_xpath(self, query, element=None, find_one=False):
@@ -1015,6 +1053,12 @@ class WebAccess(Access):
 
         """
 
+        return self._style_info(self.run_js(js_get_computed_outline, el))
+
+    @staticmethod
+    def _style_info(comp_styles):
+        """Builds the style info returned by get_style_info() from the computed
+        styles returned by js_get_computed_outline."""
         # Set up our styling info, what is the information someone would need to determine if this was accessible?
         style_info = {
             "border-style": None,
@@ -1024,8 +1068,6 @@ class WebAccess(Access):
             "parent-background": None,
         }
 
-        comp_styles = self.run_js(js_get_computed_outline, el)
-
         # If unable to execute javascript, likely due to Stale or Missing element
         if comp_styles is None:
             return None
@@ -1088,8 +1130,14 @@ class WebAccess(Access):
         self._driver.execute_script(js_focus_first_tabbable)
         self.wait_for_animation() # Have to check for animation after each focus
         
-        # Get element activated by the tab above
-        first_el = self._driver.switch_to.active_element
+        # Get element activated by the tab above. Each tab stop is described
+        #  by a single script call: the element, its xpath, position, and
+        #  focused style, plus the unfocused style of the element tabbed away from.
+        tab_stop = self.run_js(js_get_tab_stop, None, None)
+        if tab_stop is None:
+            logger.error("Could not get the first tab stop while generating tab order.")
+            return dict(), [], orig_focused_xpath
+        first_el = tab_stop["el"]
 
         # Add element to tab dict or list
         tab_els = dict()
@@ -1105,7 +1153,7 @@ class WebAccess(Access):
                 active_el = first_el
             
             # Record data about the active element
-            xpath = self._get_xpath_for_selenium_element(active_el)
+            xpath = tab_stop["xpath"]
 
             tab_els_by_index.append(xpath)
             # We want to get the styling of the element both when it is focused and when it
@@ -1123,33 +1171,40 @@ class WebAccess(Access):
                     "tab_place": recorded_tabbable,
                     "num_visits": 1,
                     "position": {
-                        "x": active_el.location["x"],
-                        "y": active_el.location["y"]
+                        "x": round(tab_stop["x"]),
+                        "y": round(tab_stop["y"])
                     },
                     "unfocused_style_info": None, # Retrieved after tabbing to the next element
-                    "focused_style_info": self.get_style_info(active_el),
+                    "focused_style_info": self._style_info(tab_stop["style"]),
                 }
 
             recorded_tabbable += 1
             prev_el = active_el
 
             # Try to go to the next element
+            next_el = None  # The element that has focus next
             try:
                 active_el.send_keys(Keys.TAB)
                 self.wait_for_animation()
-                
-                # Set active el back to the active element
-                active_el = self._driver.switch_to.active_element
             except ElementNotInteractableException as e:
                 # Unable to tab on this element, stop collecting tab order and return results
                 logger.error(f"Found uninteractable element while generating tab order.\n {str(e)}")
-                
+                next_el = active_el
 
             # Grab the styling of the element we are currently inspecting when it is unfocused
             # NOTE: This unfocused style could be problematic if:
             # 1. The element becomes hidden after tabbed off of
             # 2. Inconsistent unfocused style (style different before and after tabbed)
-            tab_els[xpath]["unfocused_style_info"] = self.get_style_info(prev_el)
+            tab_stop = self.run_js(js_get_tab_stop, next_el, prev_el)
+            if tab_stop is None:
+                # Likely a stale prev_el, whose unfocused style we then can't get.
+                tab_stop = self.run_js(js_get_tab_stop, next_el, None)
+                if tab_stop is None:
+                    logger.error("Could not get the next tab stop while generating tab order.")
+                    break
+            # Set active el back to the active element
+            active_el = tab_stop["el"]
+            tab_els[xpath]["unfocused_style_info"] = self._style_info(tab_stop["prev_style"])
 
         # Reset the focus to the original element focused
         # TODO: May cause problems if the state was modified due to tabbing and this element no longer exists
@@ -1313,6 +1368,8 @@ class ChromeWebAccess(WebAccess):
         # Access-specific parameters from the config.
         if getattr(config, "HEADLESS", True):
             options.add_argument("--headless")
+        if not getattr(config, "LOAD_IMAGES", True):
+            options.add_argument("--blink-settings=imagesEnabled=false")
 
         # Other parameters.
         options.add_argument("--no-sandbox")
@@ -1349,7 +1406,13 @@ class ChromeWebAccess(WebAccess):
         # options.add_argument("--ignore-certificate-errors")               # Ignores SSL/TSL cert checking on client
         # options.add_argument("--ignore-urlfetcher-cert-requests")         # Ignores server cert requests
 
-        self._driver = webdriver.Chrome(options=options)
+        # Use an already running browser, e.g. from a Selenium standalone-chrome
+        #  container, rather than starting chromedriver for every web access.
+        remote_url = getattr(config, "REMOTE_WEBDRIVER_URL", None)
+        if remote_url:
+            self._driver = webdriver.Remote(command_executor=remote_url, options=options)
+        else:
+            self._driver = webdriver.Chrome(options=options)
         self._driver.set_page_load_timeout(15)
 
     def _create_user_data_dir(self):
@@ -35,7 +35,8 @@ import json
 import pandas as pd
 
 
-def parse_args():
+def parse_args(argv=None):
+    """Parses the command line arguments, or argv if given (without the program name)."""
     parser = argparse.ArgumentParser()
 
     # Should be specified in configuration; here only as convenience to
@@ -51,7 +52,7 @@ def parse_args():
                         help='Path and filename to write the aggregated metrics'
                              ' to. (default is "aggregated_metrics.csv" in '
                              'the current directory)')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Make sure the output_fpath is a csv
     output_fpath = Path(args.output_fpath)
@@ -81,9 +82,17 @@ def parse_args():
     return crawl_dirs, output_fpath
 
 
-if __name__ == '__main__':
+def main(argv=None):
+    """Compiles the crawl data into one csv, as from the command line.
+
+    Args:
+        argv: Command line arguments, without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        The exit status, 0.
+    """
     # Get crawl directories
-    crawl_dirs, output_fpath = parse_args()
+    crawl_dirs, output_fpath = parse_args(argv)
 
     # Initialize the aggregate dataframe to None. This will track data for each
     #  crawl.
@@ -158,3 +167,8 @@ if __name__ == '__main__':
 
     # Write the csv to the specified path
     aggregate_df.to_csv(output_fpath, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
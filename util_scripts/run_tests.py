@@ -0,0 +1,131 @@
+"""
+Software License Agreement (Apache 2.0)
+
+Copyright (c) 2020, The MITRE Corporation.
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This project was developed by The MITRE Corporation.
+If this code is used in a deployment or embedded within another project,
+it is requested that you send an email to opensource@mitre.org in order to
+let us know where this software is being used.
+"""
+
+
+"""
+Script to run the unit tests with several test modules at a time.
+
+Each test module runs in its own `python -m unittest` process, so every module
+gets its own Chrome, web servers, and temporary output directories, just like
+the separate CI jobs. Selenium doesn't play well with threads, but separate
+processes are fine. Run it from the top-level directory:
+
+    python util_scripts/run_tests.py -j 4
+
+With --split, each test method gets its own process instead, which helps when a
+few modules hold most of the slow tests:
+
+    python util_scripts/run_tests.py -j 4 --split selenium_integration
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import subprocess
+import sys
+import unittest
+
+TESTS_DIR = Path('demodocusfw') / 'tests'
+# Modules in the tests folder that don't hold tests.
+NOT_TESTS = {'__init__.py', 'utils.py'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+
+    # Test modules to run, e.g. graph compare; defaults to all of them.
+    parser.add_argument('modules', nargs='*', help="Test modules to run (default: all).")
+
+    # Number of test modules to run at the same time.
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="Number of test modules to run at once (default: number of CPUs).")
+
+    # Run each test method in its own process, rather than each module.
+    parser.add_argument('--split', action='store_true',
+                        help="Run each test in its own process, rather than each module.")
+
+    return parser.parse_args()
+
+
+def split_tests(path):
+    """Lists the tests in a test module.
+
+    Args:
+        path: Path to the test module.
+
+    Returns:
+        The ids of the tests, e.g. demodocusfw.tests.graph.TestGraph.test_path.
+    """
+    def _iter_tests(suite):
+        for test in suite:
+            if isinstance(test, unittest.TestSuite):
+                yield from _iter_tests(test)
+            else:
+                yield test
+
+    module_name = '.'.join(path.with_suffix('').parts)
+    suite = unittest.defaultTestLoader.loadTestsFromName(module_name)
+    return [test.id() for test in _iter_tests(suite)]
+
+
+def run_module(path):
+    """Runs one test module, or a single test, in a new process.
+
+    Args:
+        path: Path to the test module, or the id of a test.
+
+    Returns:
+        A tuple of the path, the process return code, and its combined output.
+    """
+    result = subprocess.run([sys.executable, '-m', 'unittest', str(path)],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            universal_newlines=True)
+    return path, result.returncode, result.stdout
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.modules:
+        paths = [TESTS_DIR / (module if module.endswith('.py') else module + '.py')
+                 for module in args.modules]
+    else:
+        paths = sorted(p for p in TESTS_DIR.glob('*.py') if p.name not in NOT_TESTS)
+    if args.split:
+        # Listing the tests imports them, so they need the top-level directory on the path.
+        sys.path.insert(0, os.getcwd())
+        paths = [test_id for path in paths for test_id in split_tests(path)]
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        # Threads only wait on the test processes, which do the actual work.
+        for path, returncode, output in executor.map(run_module, paths):
+            print(output)
+            print(f"{path}: {'OK' if returncode == 0 else 'FAILED'}", flush=True)
+            if returncode != 0:
+                failed.append(path)
+
+    if failed:
+        sys.exit(f"Failed: {' '.join(str(path) for path in failed)}")